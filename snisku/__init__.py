@@ -18,16 +18,31 @@ Copyright 2019–2020 Viktor Eikman and Icomera AB.
 
 """
 
+from importlib import import_module
+from typing import Any
+from typing import List
 from typing import Sequence
 
-from . import argparse
-from . import exc
-from . import kvs
-from . import param
-from . import types
-from . import ui
-from . import whitelist  # Deprecated.
-
 __all__: Sequence[str] = ("argparse", "exc", "kvs", "param", "types", "ui",
                           "whitelist")
 __version__ = '0.3.0'
+
+# All submodules, for import on first access. __all__ is kept to those of
+# earlier versions, so that ‘from snisku import *’ imports none of the rest.
+# Some are specific to a platform, like ‘shared’, and some are costly to
+# import, like ‘aio’ and ‘sqlite’.
+_SUBMODULES = frozenset(__all__) | {"aio", "binary", "dispatch", "frozen",
+                                    "instrument", "ndjson", "persist",
+                                    "schema", "shared", "sqlite", "watch"}
+
+
+def __getattr__(name: str) -> Any:
+    """Import a submodule on first access, to keep importing Snisku cheap."""
+    if name in _SUBMODULES:
+        return import_module('.' + name, __name__)
+    raise AttributeError('module {!r} has no attribute {!r}'
+                         .format(__name__, name))
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | _SUBMODULES)
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""Support for asyncio: Streams of changes to key-value stores.
+
+See BaseStore.achanges, BaseStore.aload and BaseStore.adump.
+
+"""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+import asyncio
+from collections import OrderedDict
+import threading
+from typing import Any
+from typing import Dict
+from typing import Hashable
+from typing import NamedTuple
+
+# Local:
+from .dispatch import Signal
+
+
+#############
+# INTERFACE #
+#############
+
+
+# A key in place of real keys, in a change yielded by a stream that has
+# overflowed. Changes to unknown keys have been lost: Read the store anew.
+OVERFLOW = Signal('snisku.aio.OVERFLOW')
+
+
+class Change(NamedTuple):
+    """A signalled change to a key, with the keyword arguments of the signal.
+
+    For example, a value loaded from a file has ‘merge’ and ‘new_value’
+    arguments, as documented for signals in doc/sidefx.md.
+
+    """
+
+    key: Hashable
+    kwargs: Dict[str, Any]
+
+
+class ChangeStream(object):
+    """An asynchronous iterator over the signalled changes to a store.
+
+    The stream is fed by the same events as signals by key. Changes are
+    buffered until they are consumed. Changes to the same key are merged in
+    the buffer, as in a batch: Only the last is kept, in the order that keys
+    were last signalled.
+
+    The buffer holds at most ‘maxsize’ keys. A producer that can wait, such as
+    BaseStore.aload, waits for room, and then produces no more than there is
+    room for. A synchronous producer cannot, so when
+    the buffer overflows, it is emptied and replaced with a single change
+    whose key is OVERFLOW.
+
+    Signals from other threads than that of the event loop are passed to the
+    loop in a thread-safe manner.
+
+    Use a stream as an asynchronous context manager, or call ‘close’ to stop
+    it. Until it is closed, an unconsumed stream holds up loading.
+
+    """
+
+    def __init__(self, kvs, maxsize: int = 2 ** 10) -> None:
+        """Initialize. Start receiving changes to passed store.
+
+        This must be called from a coroutine.
+
+        """
+        self.kvs = kvs
+        self.maxsize = maxsize
+        self.closed = False
+
+        self._loop = asyncio.get_running_loop()
+        self._thread = threading.get_ident()
+        self._buffer: OrderedDict = OrderedDict()
+        self._ready = asyncio.Event()
+        self._room = asyncio.Event()
+        self._room.set()
+        kvs._streams = kvs._streams + (self,)
+
+    def __aiter__(self) -> 'ChangeStream':
+        return self
+
+    async def __anext__(self) -> Change:
+        buffer = self._buffer
+        while not buffer:
+            if self.closed:
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        key, kwargs = buffer.popitem(last=False)
+        self._room.set()
+        return Change(key, kwargs)
+
+    async def __aenter__(self) -> 'ChangeStream':
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        self.close()
+
+    def put(self, key: Hashable, kwargs: Dict[str, Any]) -> None:
+        """Add a change to the buffer, from any thread."""
+        if threading.get_ident() == self._thread:
+            self._put(key, kwargs)
+        else:
+            self._loop.call_soon_threadsafe(self._put, key, kwargs)
+
+    @property
+    def room(self) -> int:
+        """Return the number of keys that can be added without overflow."""
+        if self.closed:
+            return self.maxsize
+        return self.maxsize - len(self._buffer)
+
+    async def drain(self) -> None:
+        """Wait until the buffer has room, or the stream is closed."""
+        await self._room.wait()
+
+    def close(self) -> None:
+        """Stop receiving changes. Let buffered changes be consumed."""
+        self.kvs._streams = tuple(s for s in self.kvs._streams
+                                  if s is not self)
+        self.closed = True
+        self._ready.set()
+        self._room.set()
+
+    def _put(self, key: Hashable, kwargs: Dict[str, Any]) -> None:
+        if self.closed:
+            return
+        buffer = self._buffer
+        if key not in buffer and len(buffer) >= self.maxsize:
+            buffer.clear()
+            key, kwargs = OVERFLOW, dict()
+        buffer.pop(key, None)
+        buffer[key] = kwargs
+        if len(buffer) >= self.maxsize:
+            self._room.clear()
+        self._ready.set()
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks of Snisku.
+
+Each module in this package has a ‘run’ function that returns a dict of
+timings in seconds per operation, by scenario name, and can be run as a script
+to print those timings, e.g. with ‘python -m snisku.bench.dispatch’.
+
+Run the package itself, with ‘python -m snisku.bench’, for a suite of brief
+benchmarks, with saving of and comparison to baseline timings.
+
+These are not unit tests and are not collected by pytest.
+
+"""
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""Run a suite of benchmarks, optionally against a saved baseline.
+
+Save a baseline, then compare to it after a change:
+
+    python -m snisku.bench --save baseline.json
+    python -m snisku.bench --baseline baseline.json --threshold 0.25
+
+The exit status is 1 if any timing is slower than in the baseline by more
+than the threshold, as a fraction.
+
+"""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+import argparse
+import json
+import platform
+import sys
+from typing import Dict
+from typing import Optional
+from typing import Sequence
+
+# Local:
+from .. import __version__
+from . import dispatch
+from . import imports
+from . import kvs
+from . import memory
+from . import param
+from . import timestamps
+
+
+#############
+# INTERFACE #
+#############
+
+
+# Benchmarks in the suite, with arguments that keep each one brief.
+SUITE = (('dispatch', dispatch.run, dict(number=2 * 10 ** 3)),
+         ('param', param.run, dict(number=10 ** 4)),
+         ('kvs', kvs.run, dict(number=3)),
+         ('timestamps', timestamps.run, dict(number=10 ** 3)),
+         ('imports', imports.run, dict(number=3)),
+         ('memory', memory.run, dict(number=10 ** 3)))
+
+
+def run(names: Sequence[str] = tuple(s[0] for s in SUITE),
+        repeat: int = 3) -> Dict[str, float]:
+    """Run named benchmarks. Return the best result of each scenario.
+
+    Results are timings in seconds, except for scenarios with ‘bytes’ in
+    their names, which are sizes in bytes.
+
+    """
+    results: Dict[str, float] = dict()
+    for name, function, kwargs in SUITE:
+        if name not in names:
+            continue
+        for _ in range(repeat):
+            for scenario, seconds in function(**kwargs).items():
+                key = '{}/{}'.format(name, scenario)
+                results[key] = min(seconds, results.get(key, seconds))
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float],
+            threshold: float) -> Dict[str, float]:
+    """Return the ratio of each timing to its baseline, where regressed.
+
+    A timing has regressed where the ratio exceeds 1 + threshold.
+
+    Scenarios missing from either set of timings are ignored.
+
+    """
+    ratios = dict()
+    for key, seconds in results.items():
+        before = baseline.get(key)
+        if before and seconds / before > 1 + threshold:
+            ratios[key] = seconds / before
+    return ratios
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the suite from the command line. Return an exit status."""
+    parser = argparse.ArgumentParser(prog='python -m snisku.bench',
+                                     description=__doc__.splitlines()[0])
+    parser.add_argument('names', nargs='*', metavar='NAME',
+                        help='benchmarks to run, of: {} (default: all)'
+                             .format(', '.join(s[0] for s in SUITE)))
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per benchmark, keeping the best timing')
+    parser.add_argument('--save', metavar='FILE',
+                        help='save timings to FILE, as a baseline')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='compare timings to a baseline in FILE')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='fraction by which a timing may exceed its '
+                             'baseline before it counts as a regression')
+    args = parser.parse_args(argv)
+
+    names = args.names or tuple(s[0] for s in SUITE)
+    results = run(names, repeat=args.repeat)
+
+    baseline: Dict[str, float] = dict()
+    if args.baseline:
+        with open(args.baseline, mode='r') as f:
+            baseline = json.load(f)['results']
+
+    regressions = compare(results, baseline, args.threshold)
+    for key, value in results.items():
+        if '/bytes/' in key:
+            line = '{:<50} {:>10.1f} B '.format(key, value)
+        else:
+            line = '{:<50} {:>10.3f} µs'.format(key, value * 1e6)
+        if key in baseline:
+            line += ' {:>+7.1%}'.format(value / baseline[key] - 1)
+        if key in regressions:
+            line += ' REGRESSION'
+        print(line)
+
+    if args.save:
+        with open(args.save, mode='w') as f:
+            json.dump(dict(snisku=__version__,
+                           python=platform.python_version(),
+                           results=results), f, indent=2, sort_keys=True)
+
+    if regressions:
+        print('{} regression(s) beyond {:.0%}.'
+              .format(len(regressions), args.threshold), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of binary serialization against JSON.
+
+Run with an optional list of store sizes, e.g.:
+
+    python -m snisku.bench.binary 1000 100000
+
+"""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict
+from typing import Sequence
+
+# Third party:
+import arrow
+
+# Local:
+from .. import binary
+from ..kvs import KeyValueStore
+from ..types import ArrowParameter
+
+
+#############
+# INTERFACE #
+#############
+
+
+FORMATS = (('json', json.dump, json.load, ''),
+           ('binary', binary.dump, binary.load, 'b'))
+
+SIZES = (10 ** 3, 10 ** 5, 10 ** 6)
+
+
+def run(sizes: Sequence[int] = SIZES) -> Dict[str, float]:
+    """Time dump and load with each format, per key. Note file sizes."""
+    results = dict()
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            kvs = make_store(size)
+            for name, dumper, loader, binary_mode in FORMATS:
+                path = os.path.join(directory, name)
+
+                # Time the handlers alone. Merging into a store costs the same
+                # with either format.
+                with open(path, mode='w' + binary_mode) as f:
+                    start = time.perf_counter()
+                    dumper(kvs, f)
+                    dumping = time.perf_counter() - start
+                with open(path, mode='r' + binary_mode) as f:
+                    start = time.perf_counter()
+                    loader(f)
+                    loading = time.perf_counter() - start
+
+                prefix = '{}/{}/'.format(name, size)
+                results[prefix + 'dump'] = dumping / size
+                results[prefix + 'load'] = loading / size
+                results[prefix + 'bytes'] = os.path.getsize(path) / size
+    return results
+
+
+def make_store(size: int) -> KeyValueStore:
+    """Return a store of typical primitive values."""
+    moment = ArrowParameter(key='t')
+    now = arrow.utcnow()
+    kvs = KeyValueStore()
+    for i in range(size):
+        kind = i % 5
+        key = 'device_{}_setting_{}'.format(i // 5, kind)
+        if kind == 0:
+            kvs[key] = i
+        elif kind == 1:
+            kvs[key] = i / 7
+        elif kind == 2:
+            kvs[key] = bool(i % 2)
+        elif kind == 3:
+            kvs[key] = moment.dumper(now.shift(seconds=i))
+        else:
+            kvs[key] = [dict(name='option', value=i), None]
+    return kvs
+
+
+def main(argv: Sequence[str] = sys.argv[1:]) -> None:
+    """Print timings."""
+    sizes = tuple(map(int, argv)) or SIZES
+    for key, value in run(sizes).items():
+        if key.endswith('bytes'):
+            print('{:<30} {:>10.1f} B/key'.format(key, value))
+        else:
+            print('{:<30} {:>10.3f} µs/key'.format(key, value * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Microbenchmark of signal dispatchers on store-heavy workloads."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+from timeit import Timer
+from typing import Dict
+
+# Local:
+from .. import dispatch
+from ..kvs import KeyValueStore
+from ..param import BaseParameter
+
+
+#############
+# INTERFACE #
+#############
+
+
+DISPATCHERS = (('pydispatch', dispatch.PyDispatchDispatcher),
+               ('fast', dispatch.FastDispatcher))
+
+
+def run(number: int = 10 ** 5) -> Dict[str, float]:
+    """Time BaseParameter.store with each dispatcher and subscription."""
+    results = dict()
+    prior = dispatch.get_dispatcher()
+    try:
+        for name, cls in DISPATCHERS:
+            dispatch.set_dispatcher(cls())
+            for scenario, timer in _scenarios():
+                key = 'store/{}/{}'.format(scenario, name)
+                results[key] = timer.timeit(number) / number
+    finally:
+        dispatch.set_dispatcher(prior)
+    return results
+
+
+def main() -> None:
+    """Print timings."""
+    for key, seconds in run().items():
+        print('{:<40} {:>10.3f} µs'.format(key, seconds * 1e6))
+
+
+############
+# INTERNAL #
+############
+
+
+def _scenarios():
+    """Generate named timers, connecting receivers as needed.
+
+    Receivers are held by the generator, which must not be closed before the
+    timer has been used.
+
+    """
+    parameter = BaseParameter(key='a')
+
+    kvs = KeyValueStore()
+    yield 'unsubscribed', Timer(lambda: parameter.store(kvs, 1))
+
+    def receiver(new_value=None):
+        pass
+
+    kvs = KeyValueStore()
+    dispatch.connect(receiver, signal='b', sender=kvs)
+    yield 'other-key', Timer(lambda: parameter.store(kvs, 1))
+
+    kvs = KeyValueStore()
+    dispatch.connect(receiver, signal='a', sender=kvs)
+    yield 'subscribed', Timer(lambda: parameter.store(kvs, 1))
+
+    kvs = KeyValueStore()
+    dispatch.connect(receiver, signal='a', sender=kvs)
+
+    def batch():
+        with kvs.batch():
+            for i in range(100):
+                parameter.store(kvs, i)
+
+    yield 'subscribed-batch-of-100', Timer(batch)
+    dispatch.disconnect(receiver, signal='a', sender=kvs)
+
+
+if __name__ == '__main__':
+    main()
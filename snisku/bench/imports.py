@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of the time taken to import Snisku and its modules.
+
+Each import is timed in a new interpreter, with ‘-X importtime’, so that
+nothing has been imported before.
+
+"""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+import subprocess
+import sys
+from typing import Dict
+from typing import Sequence
+
+
+#############
+# INTERFACE #
+#############
+
+
+# Modules to import, by themselves.
+MODULES = ('snisku', 'snisku.types', 'snisku.kvs', 'snisku.schema',
+           'snisku.option', 'snisku.argparse')
+
+
+def run(number: int = 10, modules: Sequence[str] = MODULES
+        ) -> Dict[str, float]:
+    """Time importing each module, best of ‘number’ times, in seconds."""
+    results = dict()
+    for module in modules:
+        best = min(import_time(module) for _ in range(number))
+        results['import/{}'.format(module)] = best
+    return results
+
+
+def import_time(module: str) -> float:
+    """Return the time to import named module in a new process.
+
+    The time includes the import of the packages the module belongs to.
+
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    package = module.split('.')[0]
+    total = 0
+    started = False
+    for line in process.stderr.splitlines():
+        # Lines look like ‘import time: self | cumulative | name’, with the
+        # name indented by depth. Imports at startup come first.
+        fields = line.split('|')
+        if len(fields) != 3 or fields[2].startswith('  '):
+            continue
+        name = fields[2].strip()
+        started = started or name.split('.')[0] == package
+        if started:
+            total += int(fields[1])
+    if not started:
+        raise ValueError('No import time found for ‘{}’.'.format(module))
+    return total / 1e6
+
+
+def main() -> None:
+    """Print timings."""
+    for key, seconds in run().items():
+        print('{:<40} {:>10.3f} ms'.format(key, seconds * 1e3))
+
+
+if __name__ == '__main__':
+    main()
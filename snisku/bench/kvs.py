@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of loading and dumping key-value stores of growing size."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+import os
+import tempfile
+import time
+from typing import Dict
+from typing import Sequence
+
+# Local:
+from ..kvs import KeyValueStore
+
+
+#############
+# INTERFACE #
+#############
+
+
+SIZES = (10 ** 2, 10 ** 4, 10 ** 5)
+
+
+def run(number: int = 5, sizes: Sequence[int] = SIZES) -> Dict[str, float]:
+    """Time dump and load, best of ‘number’ times, per key, by store size."""
+    results = dict()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'settings.json')
+        for size in sizes:
+            kvs = KeyValueStore(('key_{}'.format(i), i) for i in range(size))
+            dump = load = float('inf')
+            for _ in range(number):
+                start = time.perf_counter()
+                kvs.dump(path)
+                middle = time.perf_counter()
+                KeyValueStore().load(path, signal=False)
+                end = time.perf_counter()
+                dump = min(dump, middle - start)
+                load = min(load, end - middle)
+            results['dump/{}'.format(size)] = dump / size
+            results['load/{}'.format(size)] = load / size
+    return results
+
+
+def main() -> None:
+    """Print timings."""
+    for key, seconds in run().items():
+        print('{:<40} {:>10.3f} µs/key'.format(key, seconds * 1e6))
+
+
+if __name__ == '__main__':
+    main()
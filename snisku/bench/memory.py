@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of memory used by parameters, options and UI presenters.
+
+Each class is compared to a plain class, without slots, whose instances hold
+the same attributes in a ‘__dict__’ per instance, as Snisku’s own classes did
+before they had slots. A subclass of each class without ‘__slots__’ of its own
+would not do, as it would still keep inherited attributes in slots.
+
+"""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+import tracemalloc
+from typing import Any
+from typing import Callable
+from typing import Dict
+
+# Local:
+from ..option import ExhaustiveParameter
+from ..option import Option
+from ..param import BaseParameter
+from ..types import NonnegativeIntegerParameter
+from ..ui import UserInterfacePresenter
+
+
+#############
+# INTERFACE #
+#############
+
+
+def run(number: int = 10 ** 4) -> Dict[str, float]:
+    """Measure bytes allocated per object, over ‘number’ objects."""
+    results = dict()
+    keys = ['key_{}'.format(i) for i in range(number)]
+    options = (Option(1, None), Option(2, None))
+
+    for name, cls, make in (
+            ('base-parameter', BaseParameter,
+             lambda cls, i: cls(key=keys[i])),
+            ('nonnegative-integer-parameter', NonnegativeIntegerParameter,
+             lambda cls, i: cls(key=keys[i])),
+            ('exhaustive-parameter', ExhaustiveParameter,
+             lambda cls, i: cls(key=keys[i], options=options)),
+            ('option', Option,
+             lambda cls, i: cls(i, None)),
+            ('ui', UserInterfacePresenter,
+             lambda cls, i: cls(name=keys[i]))):
+        results['bytes/{}'.format(name)] = _measure(
+            lambda i: make(cls, i), number)
+        # A new plain class for each, as instances share the keys of their
+        # dicts per class. Each slotted original is freed after copying.
+        plain = type('Plain', (object,), dict())
+        results['bytes/{}/dict'.format(name)] = _measure(
+            lambda i: _unslotted(plain, make(cls, i)), number)
+    return results
+
+
+def main() -> None:
+    """Print measurements."""
+    for key, size in run().items():
+        print('{:<50} {:>8.1f} B'.format(key, size))
+
+
+############
+# INTERNAL #
+############
+
+
+def _unslotted(plain_class: type, original: Any) -> Any:
+    """Return a plain object with the attributes of passed slotted object."""
+    plain = plain_class()
+    for cls in type(original).__mro__:
+        slots = cls.__dict__.get('__slots__', ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name not in ('__dict__', '__weakref__') and \
+                    hasattr(original, name):
+                setattr(plain, name, getattr(original, name))
+    return plain
+
+
+def _measure(make: Callable, number: int) -> float:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [make(i) for i in range(number)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(objects) == number
+    return (after - before) / number
+
+
+if __name__ == '__main__':
+    main()
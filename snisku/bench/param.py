@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Microbenchmark of parameter retrieval and validation."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+from timeit import Timer
+from typing import Any
+from typing import Dict
+
+# Local:
+from .. import types
+from ..exc import ParameterError
+from ..kvs import KeyValueStore
+from ..option import ExhaustiveParameter
+from ..option import Option
+from ..param import BaseParameter
+
+
+#############
+# INTERFACE #
+#############
+
+
+# Parameter types, with typical raw values as stored.
+TYPES = (('base', BaseParameter, 'value'),
+         ('boolean', types.BooleanParameter, True),
+         ('integer', types.AnyIntegerParameter, 42),
+         ('real', types.AnyRealParameter, 4.2),
+         ('nonnegative-integer', types.NonnegativeIntegerParameter, 42),
+         ('nonnegative-real', types.NonnegativeRealParameter, 4.2),
+         ('arrow', types.ArrowParameter, '2020-01-01T12:00:00+00:00'))
+
+# Numbers of options to an exhaustive parameter.
+OPTION_COUNTS = (1, 10, 100, 1000)
+
+
+def run(number: int = 10 ** 5) -> Dict[str, float]:
+    """Time retrieval, validation of options and handling of invalid values.
+
+    Retrieval is timed for each type, and handling of invalid values both with
+    and without raising.
+
+    """
+    results = dict()
+    for name, timer in _scenarios():
+        results[name] = timer.timeit(number) / number
+    return results
+
+
+def main() -> None:
+    """Print timings."""
+    for key, seconds in run().items():
+        print('{:<40} {:>10.3f} µs'.format(key, seconds * 1e6))
+
+
+############
+# INTERNAL #
+############
+
+
+def _scenarios():
+    """Generate named timers."""
+    for name, cls, raw in TYPES:
+        parameter = cls(key='a')
+        kvs = KeyValueStore(a=raw)
+        yield 'retrieve/{}'.format(name), Timer(
+            lambda p=parameter, kvs=kvs: p.retrieve(kvs))
+
+        kvs = KeyValueStore(a=raw)
+        kvs.enable_cache()
+        yield 'retrieve/{}/cached'.format(name), Timer(
+            lambda p=parameter, kvs=kvs: p.retrieve(kvs))
+
+    for count in OPTION_COUNTS:
+        options = tuple(Option(i, None) for i in range(count))
+        parameter = ExhaustiveParameter(key='a', options=options)
+        # The last option is the worst case for a linear scan.
+        yield 'validate/exhaustive/{}'.format(count), Timer(
+            lambda p=parameter, v=count - 1: p.parse_and_validate(v))
+
+    parameter = types.NonnegativeIntegerParameter(key='a')
+    yield 'invalid/raise', Timer(
+        lambda p=parameter: _raise(p, -1))
+    yield 'invalid/try', Timer(
+        lambda p=parameter: p.try_parse_and_validate(-1))
+
+
+def _raise(parameter: BaseParameter, value: Any) -> None:
+    try:
+        parameter.parse_and_validate(value)
+    except ParameterError:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Microbenchmark of parsing timestamps for ArrowParameter."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+from itertools import cycle
+from timeit import Timer
+from typing import Dict
+
+# Third party:
+import arrow
+
+# Local:
+from .. import types
+
+
+#############
+# INTERFACE #
+#############
+
+
+def run(number: int = 10 ** 4) -> Dict[str, float]:
+    """Time parsers on strings as written by ArrowParameter."""
+    results = dict()
+    for name, timer in _scenarios(number):
+        results[name] = timer.timeit(number) / number
+    return results
+
+
+def main() -> None:
+    """Print timings."""
+    for key, seconds in run().items():
+        print('{:<40} {:>10.3f} µs'.format(key, seconds * 1e6))
+
+
+############
+# INTERNAL #
+############
+
+
+def _scenarios(number: int):
+    """Generate named timers.
+
+    ‘distinct’ scenarios parse a new string each time, defeating any cache.
+    ‘repeated’ scenarios parse the same string each time.
+
+    """
+    start = arrow.get('2020-01-01T00:00:00.000001+02:00')
+    strings = [types.dump_arrow(start.shift(seconds=i))
+               for i in range(number)]
+    uncached = types._parse_arrow_string.__wrapped__
+
+    for name, parser in (('arrow.get', arrow.get),
+                         ('parse_arrow/uncached', uncached),
+                         ('parse_arrow', types.parse_arrow)):
+        types._parse_arrow_string.cache_clear()
+        values = cycle(strings)
+        yield 'distinct/{}'.format(name), Timer(
+            lambda p=parser, v=values: p(next(v)))
+        yield 'repeated/{}'.format(name), Timer(
+            lambda p=parser, s=strings[0]: p(s))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""Pluggable signal dispatch.
+
+Snisku sends signals through whichever dispatcher is current in this module.
+By default, that is an adapter for pydispatch, so that receivers connected
+directly through pydispatch keep working. For lower overhead, switch to the
+built-in FastDispatcher:
+
+    from snisku import dispatch
+    dispatch.set_dispatcher(dispatch.FastDispatcher())
+
+Receivers must then be connected through the dispatch module, or through the
+dispatcher itself, rather than through pydispatch.
+
+"""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+import sys
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import FrozenSet
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Tuple
+import weakref
+
+
+#############
+# INTERFACE #
+#############
+
+
+# Types for annotation.
+Receiver = Callable[..., Any]
+Responses = List[Tuple[Receiver, Any]]
+
+
+class Signal(object):
+    """A named signal that cannot be mistaken for a parameter key."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __repr__(self) -> str:
+        return '<{} {}>'.format(type(self).__name__, self.name)
+
+
+# A wildcard for connecting a receiver to any signal and/or any sender.
+ANY = Signal('snisku.dispatch.ANY')
+
+
+class Dispatcher(object):
+    """An interface for routing signals from senders to receivers.
+
+    Receivers are called with keyword arguments only, and only with those
+    arguments they accept by name, unless they accept arbitrary keyword
+    arguments. In addition to the arguments passed to ‘send’, ‘signal’ and
+    ‘sender’ are available to receivers.
+
+    """
+
+    def connect(self, receiver: Receiver, signal: Hashable = ANY,
+                sender: Any = ANY, weak: bool = True) -> None:
+        """Connect passed receiver to a signal from a sender.
+
+        With ‘weak’, the dispatcher holds only a weak reference to the
+        receiver, and disconnects it automatically when it dies.
+
+        """
+        raise NotImplementedError()
+
+    def disconnect(self, receiver: Receiver, signal: Hashable = ANY,
+                   sender: Any = ANY) -> None:
+        """Disconnect passed receiver. Do nothing if it is not connected."""
+        raise NotImplementedError()
+
+    def send(self, signal: Hashable, sender: Any, **kwargs) -> Responses:
+        """Call each receiver of passed signal from passed sender.
+
+        Return a list of pairs of receivers and their return values.
+
+        """
+        raise NotImplementedError()
+
+
+class PyDispatchDispatcher(Dispatcher):
+    """An adapter for the global router of pydispatch.
+
+    pydispatch is imported on first connection, not before. Until it has
+    been imported, by this adapter or otherwise, nothing can be connected to
+    it, so sending a signal costs one check.
+
+    """
+
+    def connect(self, receiver: Receiver, signal: Hashable = ANY,
+                sender: Any = ANY, weak: bool = True) -> None:
+        from pydispatch import dispatcher
+        dispatcher.connect(receiver, signal=self._translate(signal),
+                           sender=self._translate(sender), weak=weak)
+
+    def disconnect(self, receiver: Receiver, signal: Hashable = ANY,
+                   sender: Any = ANY) -> None:
+        from pydispatch import dispatcher
+        try:
+            dispatcher.disconnect(receiver, signal=self._translate(signal),
+                                  sender=self._translate(sender))
+        except dispatcher.errors.DispatcherKeyError:
+            pass
+
+    def send(self, signal: Hashable, sender: Any, **kwargs) -> Responses:
+        dispatcher = sys.modules.get(_PYDISPATCHER)
+        if dispatcher is None:
+            return []
+        return dispatcher.send(signal=signal, sender=sender, **kwargs)
+
+    def _translate(self, target: Any) -> Any:
+        from pydispatch import dispatcher
+        return dispatcher.Any if target is ANY else target
+
+
+class FastDispatcher(Dispatcher):
+    """A dispatcher built to do as little as possible per signal.
+
+    When nothing at all is connected, sending a signal costs one check. When
+    something is, the receivers for each combination of signal and sender are
+    computed once, as a tuple, and reused until a receiver is connected or
+    disconnected.
+
+    Senders are identified by ‘id’. A sender that can be weakly referenced,
+    such as a KeyValueStore, will be disconnected automatically when it dies.
+    A sender that cannot, such as a plain dict, should be disconnected
+    explicitly before it dies, lest its ‘id’ be reused.
+
+    """
+
+    # The maximum number of cached routes, before the cache is cleared.
+    route_limit = 2 ** 12
+
+    def __init__(self) -> None:
+        """Initialize with no connections."""
+        self._connections: Dict[Tuple[Hashable, Hashable],
+                                List['_Connection']] = dict()
+        self._routes: Dict[Tuple[Hashable, int],
+                           Tuple['_Connection', ...]] = dict()
+        self._finalizers: Dict[int, Any] = dict()
+
+    def connect(self, receiver: Receiver, signal: Hashable = ANY,
+                sender: Any = ANY, weak: bool = True) -> None:
+        assert callable(receiver)
+        sender_id = self._identify(sender)
+        if sender is not ANY and sender_id not in self._finalizers:
+            try:
+                finalizer = weakref.finalize(sender, self._forget, sender_id)
+            except TypeError:
+                pass  # Not weakly referenceable. See class docstring.
+            else:
+                finalizer.atexit = False
+                self._finalizers[sender_id] = finalizer
+
+        key = (signal, sender_id)
+        self.disconnect(receiver, signal=signal, sender=sender)
+        if weak:
+            def on_death(ref):
+                self._drop(lambda c: c.ref is ref, *key)
+        else:
+            on_death = None
+
+        connection = _Connection(receiver, on_death)
+        self._connections.setdefault(key, []).append(connection)
+        self._routes.clear()
+
+    def disconnect(self, receiver: Receiver, signal: Hashable = ANY,
+                   sender: Any = ANY) -> None:
+        self._drop(lambda c: c.resolve() == receiver,
+                   signal, self._identify(sender))
+
+    def send(self, signal: Hashable, sender: Any, **kwargs) -> Responses:
+        if not self._connections:
+            return []
+
+        route = (signal, id(sender))
+        try:
+            connections = self._routes[route]
+        except KeyError:
+            connections = self._route(*route)
+
+        responses = []
+        for connection in connections:
+            receiver = connection.resolve()
+            if receiver is not None:
+                responses.append((receiver, connection.call(
+                    receiver, signal, sender, kwargs)))
+        return responses
+
+    def _identify(self, sender: Any) -> Hashable:
+        return ANY if sender is ANY else id(sender)
+
+    def _route(self, signal: Hashable, sender_id: int
+               ) -> Tuple['_Connection', ...]:
+        """Compute and cache the receivers for a signal from a sender."""
+        connections = tuple(
+            c
+            for k in ((signal, sender_id), (signal, ANY),
+                      (ANY, sender_id), (ANY, ANY))
+            for c in self._connections.get(k, ()))
+        if len(self._routes) >= self.route_limit:
+            self._routes.clear()
+        self._routes[(signal, sender_id)] = connections
+        return connections
+
+    def _drop(self, predicate: Callable[['_Connection'], bool],
+              signal: Hashable, sender_id: Hashable) -> None:
+        """Remove matching connections."""
+        key = (signal, sender_id)
+        connections = self._connections.get(key)
+        if not connections:
+            return
+        connections[:] = [c for c in connections if not predicate(c)]
+        if not connections:
+            del self._connections[key]
+        self._routes.clear()
+
+    def _forget(self, sender_id: int) -> None:
+        """Remove all connections to a dead sender."""
+        self._finalizers.pop(sender_id, None)
+        for key in [k for k in self._connections if k[1] == sender_id]:
+            del self._connections[key]
+        self._routes.clear()
+
+
+# The dispatcher currently used by Snisku.
+current: Dispatcher = PyDispatchDispatcher()
+
+
+def get_dispatcher() -> Dispatcher:
+    """Return the dispatcher currently used by Snisku."""
+    return current
+
+
+def set_dispatcher(dispatcher: Dispatcher) -> None:
+    """Replace the dispatcher used by Snisku.
+
+    Receivers connected to the previous dispatcher are not carried over.
+
+    """
+    global current
+    assert isinstance(dispatcher, Dispatcher)
+    current = dispatcher
+
+
+def connect(receiver: Receiver, signal: Hashable = ANY, sender: Any = ANY,
+            weak: bool = True) -> None:
+    """Connect passed receiver through the current dispatcher."""
+    current.connect(receiver, signal=signal, sender=sender, weak=weak)
+
+
+def disconnect(receiver: Receiver, signal: Hashable = ANY,
+               sender: Any = ANY) -> None:
+    """Disconnect passed receiver from the current dispatcher."""
+    current.disconnect(receiver, signal=signal, sender=sender)
+
+
+def send(signal: Hashable, sender: Any, **kwargs) -> Responses:
+    """Send a signal through the current dispatcher."""
+    return current.send(signal, sender, **kwargs)
+
+
+############
+# INTERNAL #
+############
+
+
+# The name of the module of pydispatch with its global router.
+_PYDISPATCHER = 'pydispatch.dispatcher'
+
+
+class _Connection(object):
+    """A receiver as connected to a FastDispatcher.
+
+    The names of the keyword arguments accepted by the receiver are computed
+    once, on connection.
+
+    """
+
+    __slots__ = ('ref', 'resolve', 'names')
+
+    def __init__(self, receiver: Receiver,
+                 on_death: Optional[Callable[[Any], None]]) -> None:
+        if on_death is None:
+            self.ref = None
+            self.resolve = lambda: receiver
+        else:
+            if hasattr(receiver, '__self__') and hasattr(receiver,
+                                                         '__func__'):
+                self.ref = weakref.WeakMethod(receiver, on_death)
+            else:
+                self.ref = weakref.ref(receiver, on_death)
+            self.resolve = self.ref
+        self.names = _accepted_names(receiver)
+
+    def call(self, receiver: Receiver, signal: Hashable, sender: Any,
+             kwargs: Dict[str, Any]) -> Any:
+        names = self.names
+        if names is None:
+            return receiver(signal=signal, sender=sender, **kwargs)
+        selection = {k: v for k, v in kwargs.items() if k in names}
+        if 'signal' in names:
+            selection['signal'] = signal
+        if 'sender' in names:
+            selection['sender'] = sender
+        return receiver(**selection)
+
+
+def _accepted_names(receiver: Receiver) -> Optional[FrozenSet[str]]:
+    """Return names of keyword arguments accepted, or None for any."""
+    from inspect import Parameter
+    from inspect import signature
+    try:
+        parameters = signature(receiver).parameters.values()
+    except (TypeError, ValueError):
+        return None
+    names = set()
+    for parameter in parameters:
+        if parameter.kind is Parameter.VAR_KEYWORD:
+            return None
+        if parameter.kind in (Parameter.POSITIONAL_OR_KEYWORD,
+                              Parameter.KEYWORD_ONLY):
+            names.add(parameter.name)
+    return frozenset(names)
@@ -1,5 +1,21 @@
 # -*- coding: utf-8 -*-
-"""Exceptions."""
+"""Exceptions, and results that stand in for them."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+from typing import Any
+from typing import Hashable
+from typing import Optional
+from typing import Type
+
+
+#############
+# INTERFACE #
+#############
 
 
 class ParameterError(Exception):
@@ -16,3 +32,78 @@ class ValidatorError(ValueError, ParameterError):
 
 class ValidationFailure(ValueError, ParameterError):
     """A signal that a validator has rejected a candidate value."""
+
+
+class InvalidContents(ValueError, ParameterError):
+    """A signal that contents, as loaded from a file, have invalid values.
+
+    ‘errors’ maps each key with an invalid value to the exception it raised.
+
+    """
+
+    def __init__(self, errors) -> None:
+        """Initialize."""
+        super().__init__(errors)
+        self.errors = errors
+
+    def __str__(self) -> str:
+        return 'Invalid value for {} key(s): {}.'.format(
+            len(self.errors), ', '.join(map(repr, self.errors)))
+
+
+class Result(object):
+    """The outcome of parsing and validating a value, without an exception.
+
+    A result is true if the value is valid. ‘value’ is then the refined value.
+    Otherwise, ‘error’ is the class of ParameterError that would have been
+    raised, ‘value’ is the value that could not be parsed or validated, and
+    ‘cause’ is any exception raised by the parser or validator. The message
+    of the error is formatted only when it is read.
+
+    """
+
+    __slots__ = ('value', 'error', 'cause', 'key')
+
+    def __init__(self, value: Any,
+                 error: Optional[Type[ParameterError]] = None,
+                 cause: Optional[Exception] = None,
+                 key: Hashable = None) -> None:
+        """Initialize."""
+        self.value = value
+        self.error = error
+        self.cause = cause
+        self.key = key
+
+    def __bool__(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        if self.error is None:
+            return 'Result({!r})'.format(self.value)
+        return 'Result({!r}, {})'.format(self.value, self.error.__name__)
+
+    @property
+    def message(self) -> str:
+        """Return the message of the error, or an empty string."""
+        if self.error is None:
+            return ''
+        return _MESSAGES[self.error].format(self.value, self.key)
+
+    def unwrap(self) -> Any:
+        """Return the refined value, or raise the error from its cause."""
+        if self.error is None:
+            return self.value
+        if self.cause is None:
+            raise self.error(self.message)
+        raise self.error(self.message) from self.cause
+
+
+############
+# INTERNAL #
+############
+
+
+# Templates of messages, by class of error, for a value and a key.
+_MESSAGES = {ParserError: 'Could not parse ‘{!r}’ as a value for ‘{}’.',
+             ValidatorError: 'Could not validate ‘{!r}’ as a value for ‘{}’.',
+             ValidationFailure: 'Value ‘{!r}’ is not valid for ‘{}’.'}
@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+"""Immutable key-value storage of parameters, with structural sharing.
+
+FrozenKeyValueStore is a persistent mapping: Instead of mutating it, ‘set’ and
+‘delete’ return a new version, which shares all unchanged structure with the
+old version. Keeping many versions of a large store that differ by a few keys
+therefore costs memory in proportion to the differences.
+
+The implementation is a hash array mapped trie (HAMT), with 32-way branching.
+
+"""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+from typing import Any
+from typing import Hashable
+from typing import Iterable
+from typing import Iterator
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+# Local:
+from .kvs import KeyValueStore
+from .kvs import Patch
+
+
+#############
+# INTERFACE #
+#############
+
+
+class FrozenKeyValueStore(Mapping):
+    """An immutable mapping of keys to values.
+
+    This works with BaseParameter.retrieve, but not with ‘store’ or ‘reset’,
+    which would mutate it. Use ‘set’ and ‘delete’ instead, e.g.:
+
+        v2 = v1.set(parameter.key, parameter.dumper(value))
+
+    Convert a KeyValueStore to a FrozenKeyValueStore by passing it to the
+    constructor, and back again with ‘thaw’. Both conversions are O(n).
+
+    """
+
+    __slots__ = ('_root', '_size')
+
+    def __init__(self, contents: Union[Mapping,
+                                       Iterable[Tuple[Hashable, Any]]] = ()
+                 ) -> None:
+        """Initialize with passed contents, as for a dict."""
+        pairs = contents.items() if isinstance(contents, Mapping) else contents
+        root: Optional[_Node] = None
+        size = 0
+        for key, value in pairs:
+            root, added = _assoc(root, 0, _hash(key), key, value)
+            size += added
+        self._root = root
+        self._size = size
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = _lookup(self._root, _hash(key), key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: Any) -> bool:
+        return _lookup(self._root, _hash(key), key) is not _MISSING
+
+    def __iter__(self) -> Iterator[Hashable]:
+        for key, _ in _items(self._root):
+            yield key
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __repr__(self) -> str:
+        return '{}({!r})'.format(type(self).__name__, dict(_items(self._root)))
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Override parent method for speed."""
+        value = _lookup(self._root, _hash(key), key)
+        return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: Any) -> 'FrozenKeyValueStore':
+        """Return a new version of self, with passed key set to value."""
+        root, added = _assoc(self._root, 0, _hash(key), key, value)
+        if root is self._root:
+            return self
+        return self._evolve(root, self._size + added)
+
+    def delete(self, key: Hashable) -> 'FrozenKeyValueStore':
+        """Return a new version of self, without passed key.
+
+        Raise KeyError if there is no such key.
+
+        """
+        root = _dissoc(self._root, 0, _hash(key), key)
+        if root is self._root:
+            raise KeyError(key)
+        return self._evolve(root, self._size - 1)
+
+    def update(self, contents: Union[Mapping,
+                                     Iterable[Tuple[Hashable, Any]]]
+               ) -> 'FrozenKeyValueStore':
+        """Return a new version of self, updated as a dict would be."""
+        pairs = contents.items() if isinstance(contents, Mapping) else contents
+        root = self._root
+        size = self._size
+        for key, value in pairs:
+            root, added = _assoc(root, 0, _hash(key), key, value)
+            size += added
+        return self._evolve(root, size)
+
+    def diff(self, other: Mapping) -> Patch:
+        """Return a patch that would make self equal to passed mapping.
+
+        As for KeyValueStore.diff. Where ‘other’ is a FrozenKeyValueStore,
+        such as a later version of self, structure shared between the two is
+        skipped, so the cost is proportional to their differences.
+
+        """
+        patch: Patch = dict(set=[], unset=[])
+        if isinstance(other, FrozenKeyValueStore):
+            _diff(self._root, other._root, 0, patch)
+        else:
+            patch['set'] = [[k, v] for k, v in other.items()
+                            if self.get(k, _MISSING) != v]
+            patch['unset'] = [k for k in self if k not in other]
+        return patch
+
+    def thaw(self) -> KeyValueStore:
+        """Return a new KeyValueStore with the contents of self."""
+        return KeyValueStore(_items(self._root))
+
+    def _evolve(self, root: Optional['_Node'], size: int
+                ) -> 'FrozenKeyValueStore':
+        new = object.__new__(type(self))
+        new._root = root
+        new._size = size
+        return new
+
+
+############
+# INTERNAL #
+############
+
+
+# Bits of hash consumed per level of the trie, and the resulting mask.
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+
+# Hashes are truncated to this many bits. Keys with equal truncated hashes
+# share a collision node.
+_HASH_BITS = 64
+
+# A marker for a key not found.
+_MISSING = object()
+
+
+class _Bitmap(object):
+    """A branch of the trie.
+
+    Each set bit in ‘bitmap’ corresponds to an entry, in order. An entry is
+    either a leaf, as a tuple of hash, key and value, or another node.
+
+    """
+
+    __slots__ = ('bitmap', 'entries')
+
+    def __init__(self, bitmap: int, entries: tuple) -> None:
+        self.bitmap = bitmap
+        self.entries = entries
+
+
+class _Collision(object):
+    """A node for leaves whose keys have the same hash."""
+
+    __slots__ = ('hash', 'entries')
+
+    def __init__(self, hash: int, entries: tuple) -> None:
+        self.hash = hash
+        self.entries = entries
+
+
+_Node = Union[_Bitmap, _Collision]
+
+
+def _hash(key: Hashable) -> int:
+    return hash(key) & ((1 << _HASH_BITS) - 1)
+
+
+def _popcount(n: int) -> int:
+    return bin(n).count('1')
+
+
+def _lookup(node: Optional[_Node], h: int, key: Hashable) -> Any:
+    shift = 0
+    while node is not None:
+        if type(node) is _Collision:
+            if h != node.hash:
+                return _MISSING
+            for leaf in node.entries:
+                if leaf[1] is key or leaf[1] == key:
+                    return leaf[2]
+            return _MISSING
+        bit = 1 << ((h >> shift) & _MASK)
+        bitmap = node.bitmap
+        if not bitmap & bit:
+            return _MISSING
+        entry = node.entries[_popcount(bitmap & (bit - 1))]
+        if type(entry) is tuple:
+            if entry[0] == h and (entry[1] is key or entry[1] == key):
+                return entry[2]
+            return _MISSING
+        node = entry
+        shift += _BITS
+    return _MISSING
+
+
+def _assoc(node: Optional[_Node], shift: int, h: int, key: Hashable,
+           value: Any) -> Tuple[Optional[_Node], bool]:
+    """Return a node with passed key set, and whether the key was added.
+
+    Return the same node if the key already had the same value.
+
+    """
+    leaf = (h, key, value)
+    if node is None:
+        return _Bitmap(1 << ((h >> shift) & _MASK), (leaf,)), True
+
+    if type(node) is _Collision:
+        if h != node.hash:
+            return _split(shift, node, node.hash, leaf, h), True
+        entries = node.entries
+        for i, entry in enumerate(entries):
+            if entry[1] is key or entry[1] == key:
+                if entry[2] is value:
+                    return node, False
+                return _Collision(h, entries[:i] + (leaf,) +
+                                  entries[i + 1:]), False
+        return _Collision(h, entries + (leaf,)), True
+
+    bit = 1 << ((h >> shift) & _MASK)
+    index = _popcount(node.bitmap & (bit - 1))
+    entries = node.entries
+    if not node.bitmap & bit:
+        return _Bitmap(node.bitmap | bit,
+                       entries[:index] + (leaf,) + entries[index:]), True
+
+    entry = entries[index]
+    if type(entry) is tuple:
+        if entry[0] == h and (entry[1] is key or entry[1] == key):
+            if entry[2] is value:
+                return node, False
+            replacement: Any = leaf
+            added = False
+        else:
+            replacement = _split(shift + _BITS, entry, entry[0], leaf, h)
+            added = True
+    else:
+        replacement, added = _assoc(entry, shift + _BITS, h, key, value)
+        if replacement is entry:
+            return node, False
+    return _Bitmap(node.bitmap, entries[:index] + (replacement,) +
+                   entries[index + 1:]), added
+
+
+def _split(shift: int, a: Any, a_hash: int, b: Any, b_hash: int) -> _Node:
+    """Return a node for two entries with different keys, and their hashes.
+
+    The entries may be leaves, or one may be a collision node.
+
+    """
+    if a_hash == b_hash:
+        return _Collision(a_hash, (a, b))
+    a_bit = 1 << ((a_hash >> shift) & _MASK)
+    b_bit = 1 << ((b_hash >> shift) & _MASK)
+    if a_bit == b_bit:
+        return _Bitmap(a_bit, (_split(shift + _BITS, a, a_hash, b, b_hash),))
+    return _Bitmap(a_bit | b_bit, (a, b) if a_bit < b_bit else (b, a))
+
+
+def _dissoc(node: Optional[_Node], shift: int, h: int,
+            key: Hashable) -> Optional[Union[_Node, tuple]]:
+    """Return a node without passed key, or the same node if it is absent.
+
+    Return None for an empty node. Return a leaf in place of a node that
+    would hold only that leaf, for the caller to inline, except at the root.
+
+    """
+    if node is None:
+        return None
+
+    if type(node) is _Collision:
+        if h != node.hash:
+            return node
+        entries = tuple(e for e in node.entries
+                        if not (e[1] is key or e[1] == key))
+        if len(entries) == len(node.entries):
+            return node
+        if len(entries) == 1 and shift:
+            return entries[0]
+        return _Collision(node.hash, entries)
+
+    bit = 1 << ((h >> shift) & _MASK)
+    if not node.bitmap & bit:
+        return node
+    index = _popcount(node.bitmap & (bit - 1))
+    entries = node.entries
+    entry = entries[index]
+    if type(entry) is tuple:
+        if not (entry[0] == h and (entry[1] is key or entry[1] == key)):
+            return node
+        replacement = None
+    else:
+        replacement = _dissoc(entry, shift + _BITS, h, key)
+        if replacement is entry:
+            return node
+
+    if replacement is None:
+        bitmap = node.bitmap & ~bit
+        entries = entries[:index] + entries[index + 1:]
+        if not bitmap:
+            return None
+        if shift and len(entries) == 1 and type(entries[0]) is tuple:
+            return entries[0]
+        return _Bitmap(bitmap, entries)
+
+    if shift and len(entries) == 1 and type(replacement) is tuple:
+        return replacement
+    return _Bitmap(node.bitmap, entries[:index] + (replacement,) +
+                   entries[index + 1:])
+
+
+def _diff(a: Any, b: Any, shift: int, patch: Patch) -> None:
+    """Add the differences between two entries of a trie to a patch.
+
+    Each entry may be a node, a leaf or None, at the same position.
+
+    """
+    if a is b:
+        return
+    if type(a) is _Bitmap and type(b) is _Bitmap:
+        entries_a = iter(a.entries)
+        entries_b = iter(b.entries)
+        for i in range(_MASK + 1):
+            bit = 1 << i
+            entry_a = next(entries_a) if a.bitmap & bit else None
+            entry_b = next(entries_b) if b.bitmap & bit else None
+            _diff(entry_a, entry_b, shift + _BITS, patch)
+        return
+
+    # Fall back to comparing the contents of small subtrees.
+    contents_a = dict(_items(a))
+    contents_b = dict(_items(b))
+    patch['set'].extend([k, v] for k, v in contents_b.items()
+                        if contents_a.get(k, _MISSING) != v)
+    patch['unset'].extend(k for k in contents_a if k not in contents_b)
+
+
+def _items(node: Any) -> Iterator[Tuple[Hashable, Any]]:
+    """Generate key-value pairs from a node, a leaf or None."""
+    if node is None:
+        return
+    if type(node) is tuple:
+        yield node[1], node[2]
+        return
+    for entry in node.entries:
+        if type(entry) is tuple:
+            yield entry[1], entry[2]
+        else:
+            yield from _items(entry)
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""Optional instrumentation of parameters, by key.
+
+When enabled, the methods of BaseParameter listed in OPERATIONS are replaced,
+on the class, with wrappers that count calls and failures and time each call.
+When disabled, the original methods are restored, so instrumentation costs
+nothing.
+
+Subclasses that override an instrumented method are measured only insofar as
+they call the method of BaseParameter. Timings are inclusive: Storing a value
+includes signalling the change, for example.
+
+"""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+from functools import wraps
+import threading
+from time import perf_counter
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import Optional
+from typing import Tuple
+
+# Local:
+from .exc import Result
+from .param import BaseParameter
+
+
+#############
+# INTERFACE #
+#############
+
+
+# Names of instrumented methods of BaseParameter, and their names as
+# operations in statistics.
+OPERATIONS = (('parse_and_validate', 'parse_and_validate'),
+              ('try_parse_and_validate', 'try_parse_and_validate'),
+              ('store', 'store'),
+              ('reset', 'reset'),
+              ('_signal', 'signal'))
+
+
+class Statistics(object):
+    """Measurements of one operation on one key."""
+
+    __slots__ = ('count', 'failures', 'seconds_total', 'seconds_max')
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.count = 0
+        self.failures: Dict[str, int] = dict()
+        self.seconds_total = 0.0
+        self.seconds_max = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a plain dict, with failures by exception class name."""
+        return dict(count=self.count, failures=dict(self.failures),
+                    seconds_total=self.seconds_total,
+                    seconds_max=self.seconds_max)
+
+
+def enable() -> None:
+    """Start instrumenting parameters. Keep any prior statistics."""
+    if _originals:
+        return
+    for attribute, operation in OPERATIONS:
+        method = getattr(BaseParameter, attribute)
+        _originals[attribute] = method
+        setattr(BaseParameter, attribute, _instrumented(operation, method))
+
+
+def disable() -> None:
+    """Stop instrumenting parameters. Keep statistics."""
+    while _originals:
+        attribute, method = _originals.popitem()
+        setattr(BaseParameter, attribute, method)
+
+
+def is_enabled() -> bool:
+    """Return True if parameters are being instrumented."""
+    return bool(_originals)
+
+
+def reset() -> None:
+    """Discard all statistics."""
+    with _lock:
+        _statistics.clear()
+
+
+def as_dict() -> Dict[Hashable, Dict[str, Dict[str, Any]]]:
+    """Return a copy of all statistics, by key and then by operation."""
+    result: Dict[Hashable, Dict[str, Dict[str, Any]]] = dict()
+    with _lock:
+        for (key, operation), statistics in _statistics.items():
+            result.setdefault(key, dict())[operation] = statistics.as_dict()
+    return result
+
+
+def prometheus(prefix: str = 'snisku_parameter') -> str:
+    """Return all statistics in the text format of Prometheus."""
+    with _lock:
+        items = [(k, o, s.as_dict()) for (k, o), s in _statistics.items()]
+
+    lines = list()
+
+    def family(name, kind, description, samples):
+        name = prefix + '_' + name
+        lines.append('# HELP {} {}'.format(name, description))
+        lines.append('# TYPE {} {}'.format(name, kind))
+        for labels, value in samples:
+            lines.append('{}{{{}}} {!r}'.format(name, _labels(labels), value))
+
+    family('calls_total', 'counter', 'Calls to a method of a parameter.',
+           [((k, o), s['count']) for k, o, s in items])
+    family('failures_total', 'counter',
+           'Calls to a method of a parameter that raised an exception.',
+           [((k, o, e), n) for k, o, s in items
+            for e, n in sorted(s['failures'].items())])
+    family('seconds_total', 'counter',
+           'Time spent in a method of a parameter.',
+           [((k, o), s['seconds_total']) for k, o, s in items])
+    family('seconds_max', 'gauge',
+           'Longest time spent in a single call to a method of a parameter.',
+           [((k, o), s['seconds_max']) for k, o, s in items])
+    return '\n'.join(lines) + '\n'
+
+
+############
+# INTERNAL #
+############
+
+
+# Original methods of BaseParameter, by name, while instrumentation is on.
+_originals: Dict[str, Callable] = dict()
+
+# Statistics by key and operation, and a lock for updating them.
+_statistics: Dict[Tuple[Hashable, str], Statistics] = dict()
+_lock = threading.Lock()
+
+
+def _instrumented(operation: str, method: Callable) -> Callable:
+    """Return a wrapper of passed method that records statistics.
+
+    A false Result counts as a failure, as if its error had been raised.
+
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        failure: Optional[str] = None
+        start = perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+            if isinstance(result, Result) and not result:
+                failure = result.error.__name__
+            return result
+        except Exception as e:
+            failure = type(e).__name__
+            raise
+        finally:
+            _record(self.key, operation, perf_counter() - start, failure)
+    return wrapper
+
+
+def _record(key: Hashable, operation: str, seconds: float,
+            failure: Optional[str]) -> None:
+    with _lock:
+        statistics = _statistics.get((key, operation))
+        if statistics is None:
+            statistics = _statistics[(key, operation)] = Statistics()
+        statistics.count += 1
+        statistics.seconds_total += seconds
+        if seconds > statistics.seconds_max:
+            statistics.seconds_max = seconds
+        if failure is not None:
+            statistics.failures[failure] = \
+                statistics.failures.get(failure, 0) + 1
+
+
+def _labels(values: Tuple[Any, ...]) -> str:
+    """Return Prometheus labels for key, operation and exception class."""
+    names = ('key', 'operation', 'exception')
+    return ','.join('{}="{}"'.format(n, _escape(str(v)))
+                    for n, v in zip(names, values))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
@@ -7,12 +7,33 @@
 
 
 # Standard:
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from functools import partial
 import json
 from typing import Any
+from typing import Dict
 from typing import Hashable
+from typing import Iterable
+from typing import Iterator
+from typing import Mapping
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from typing import TYPE_CHECKING
+from typing import Union
 
-# Third party:
-from pydispatch import dispatcher
+# Local:
+from . import dispatch
+from .dispatch import Signal
+from .exc import Result
+from .persist import Autosaver
+from .persist import Journal
+from .persist import write_atomically
+from .watch import Watcher
+
+if TYPE_CHECKING:
+    from .aio import ChangeStream
 
 
 #############
@@ -20,66 +41,734 @@ from pydispatch import dispatcher
 #############
 
 
-class KeyValueStore(dict):
-    """A dict with a few conveniences for serialization.
+# Types for annotation. A patch is a dict with two items: ‘set’, a list of
+# key-value pairs as lists, and ‘unset’, a list of keys. It may also have a
+# ‘clear’ item, which is True. A patch is serializable as JSON, given keys and
+# values that are.
+Patch = Dict[str, Any]
 
-    This is intended as a snapshot of primitive keys to primitive values. These
-    are not packaged for immediate use but rather intended for serialization,
-    transport and logging. For example, a Gunka unit may take a KeyValueStore
-    as one of its inputs.
 
-    Parameter objects get their values from a KeyValueStore at need. This
-    process may produce rich output, but a KeyValueStore cannot, by itself,
-    produce richer representations of its raw data.
+# A signal sent by a key-value store at the end of each batch of changes that
+# are themselves signalled by key. The keys changed are passed as ‘keys’, a
+# frozenset. Changes signalled outside a batch are not followed by this signal.
+CHANGED = Signal('snisku.kvs.CHANGED')
+
+
+class BaseStore(object):
+    """Conveniences for key-value stores, as a mixin for mappings.
+
+    This class provides signalling, batching, caching, observation and
+    serialization. A subclass must also inherit from a mutable mapping type,
+    and must notify observers of mutation, as described in ‘observe’. It must
+    also implement ‘_clear’ and ‘_dumpable’.
 
     """
 
-    def dump(self, filepath, handler=json.dump) -> None:
-        """Dump the contents to named file."""
-        with open(filepath, mode='w') as f:
-            handler(self, f)
+    # An optional cache of parsed values. See enable_cache.
+    parse_cache = None
+
+    # Observers of mutation, each with a ‘changed’ method taking a key and a
+    # ‘cleared’ method taking no arguments. See observe.
+    _observers: Tuple[Any, ...] = ()
+
+    # Streams of signalled changes. See achanges.
+    _streams: Tuple[Any, ...] = ()
+
+    # Held signals, by key, while a batch is open. See batch.
+    _held: Optional[Dict[Hashable, Dict[str, Any]]] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Omit observers, streams, held signals and any parse cache.
+
+        These belong to the instance, not to its contents. A copy or unpickled
+        store therefore starts without them, like a new store.
+
+        """
+        return {k: v for k, v in vars(self).items() if k not in _HOOKS}
+
+    def enable_cache(self) -> 'ParseCache':
+        """Start caching parsed, validated values. Return the cache.
+
+        The cache is consulted by BaseParameter.retrieve and is invalidated,
+        key by key, whenever this store is mutated through its own methods.
+
+        """
+        if self.parse_cache is None:
+            self.parse_cache = ParseCache()
+            self.observe(self.parse_cache)
+        return self.parse_cache
+
+    def disable_cache(self) -> None:
+        """Stop caching parsed values and discard the cache."""
+        if self.parse_cache is not None:
+            self.unobserve(self.parse_cache)
+            self.parse_cache = None
+
+    def autosave(self, filepath, interval: float = 1.0, handler=json.dump,
+                 mode: str = 'w') -> Autosaver:
+        """Start saving self to named file as it changes. Return the saver.
+
+        Changes are saved at most once per ‘interval’ seconds, from a
+        background thread, and atomically. Call ‘flush’ on the returned
+        Autosaver to save pending changes immediately, and ‘close’ to stop.
+        Pending changes are saved at interpreter exit.
+
+        Unlike a signal handler, autosave notices changes that are not
+        signalled.
+
+        """
+        return Autosaver(self, filepath, interval=interval, handler=handler,
+                         mode=mode)
+
+    def journal(self, filepath, threshold: int = 2 ** 20, sync: bool = False,
+                signal: bool = True) -> Journal:
+        """Start journalling changes to self into named file. Return journal.
+
+        Any existing journal at the named file is first replayed into self, as
+        if by ‘load’ with default arguments except for ‘signal’. Thereafter,
+        each change to self costs one small record appended to a log file,
+        instead of a full dump. See Journal.
+
+        """
+        return Journal(self, filepath, threshold=threshold, sync=sync,
+                       signal=signal)
+
+    def watch(self, filepath, interval: Optional[float] = 1.0,
+              handler=json.load, mode: str = 'r', signal: bool = True
+              ) -> Watcher:
+        """Start loading named file into self as it changes. Return watcher.
+
+        The file is loaded at once if it exists, and again whenever a poll,
+        every ‘interval’ seconds, finds that it has changed. Only keys with new
+        values are signalled. Call ‘close’ on the returned Watcher to stop.
+
+        """
+        return Watcher(self, filepath, interval=interval, handler=handler,
+                       mode=mode, signal=signal)
+
+    def fork(self) -> 'KeyValueOverlay':
+        """Return a new, empty layer over self, for a child unit of work.
+
+        This is a cheaper alternative to copying self. See KeyValueOverlay.
+
+        """
+        return KeyValueOverlay(self)
+
+    def observe(self, observer: Any) -> None:
+        """Notify passed observer of each mutation of self.
+
+        The observer’s ‘changed’ method is called with each key that is set
+        or removed, after the fact. Its ‘cleared’ method is called when all
+        keys are removed at once.
+
+        This is a low-level mechanism for caches and persistence. Unlike
+        signals, it is neither optional nor batched.
+
+        """
+        self._observers = self._observers + (observer,)
+
+    def unobserve(self, observer: Any) -> None:
+        """Stop notifying passed observer."""
+        self._observers = tuple(o for o in self._observers
+                                if o is not observer)
+
+    @contextmanager
+    def batch(self) -> Iterator['BaseStore']:
+        """Hold signals from self until the end of a ‘with’ block.
+
+        Signals are merged by key: Only the last signal for each key is sent,
+        in the order that keys were last signalled. After those signals, a
+        single CHANGED signal is sent for all of them.
+
+        Changes to the store itself are not held back, nor rolled back if the
+        block raises an exception. Held signals are sent in either case.
+
+        Batches can be nested. Only the outermost batch sends signals.
+
+        """
+        if self._held is not None:
+            yield self
+            return
+
+        self._held = dict()
+        try:
+            yield self
+        finally:
+            held, self._held = self._held, None
+            for key, kwargs in held.items():
+                dispatch.current.send(key, self, **kwargs)
+                for stream in self._streams:
+                    stream.put(key, kwargs)
+            if held:
+                dispatch.current.send(CHANGED, self, keys=frozenset(held))
+
+    def dump(self, filepath, handler=json.dump, atomic: bool = False,
+             mode: str = 'w') -> None:
+        """Dump the contents to named file.
+
+        With ‘atomic’, write to a temporary file in the same directory, sync
+        it to disk and then rename it over the named file, so that a crash
+        cannot leave the named file incomplete.
+
+        Pass ‘mode’ as ‘wb’ for a handler that writes bytes.
+
+        """
+        _write(self._dumpable(), filepath, handler, atomic, mode)
 
     def load(self, filepath, handler=json.load,
-             merge=True, new_only=True, signal=True) -> Any:
-        """Load contents of file into self. Also return the contents."""
-        with open(filepath, mode='r') as f:
-            contents = handler(f)
-
-        for key, value in contents.copy().items():
-            if new_only and key in self and value == self[key]:
-                # The value is not new. Ignore it.
-                contents.pop(key)
-                continue
-            if merge:
-                # Write to self.
+             merge=True, new_only=True, signal=True, mode: str = 'r',
+             schema=None) -> Any:
+        """Load contents of file into self. Also return the contents.
+
+        The handler may return a dict, or an iterable of key-value pairs, as
+        from a streaming handler such as snisku.ndjson.load. In the latter
+        case, the pairs are consumed before the file is closed, and a new dict
+        is returned.
+
+        Pass ‘mode’ as ‘rb’ for a handler that reads bytes.
+
+        With a ‘schema’, such as a ParameterSet, each value whose key is in
+        the schema is parsed and validated before anything is merged. If any
+        value is invalid, nothing is merged and InvalidContents is raised,
+        listing all invalid values. Otherwise, if the parse cache is enabled,
+        the parsed values of merged keys are cached, so that they are not
+        parsed again on retrieval.
+
+        """
+        if schema is None:
+            with open(filepath, mode=mode) as f:
+                return self.absorb(handler(f), merge=merge, new_only=new_only,
+                                   signal=signal)
+
+        contents = _read(filepath, handler, mode)
+        if not isinstance(contents, dict):
+            contents = dict(contents)
+        refined = schema.refine(contents)
+        new = self.absorb(contents, merge=merge, new_only=new_only,
+                          signal=signal)
+        cache = self.parse_cache
+        if cache is not None and merge:
+            for key, raw in new.items():
+                if key in refined and self.get(key, _MISSING) is raw:
+                    cache.store(schema[key], raw, refined[key])
+        return new
+
+    async def adump(self, filepath, handler=json.dump, atomic: bool = False,
+                    mode: str = 'w') -> None:
+        """Dump the contents to named file, without blocking the event loop.
+
+        As ‘dump’, except that serialization and writing take place in the
+        default executor of the running loop, on a shallow copy of the store.
+
+        """
+        import asyncio
+        snapshot = dict(self._dumpable())
+        await asyncio.get_running_loop().run_in_executor(
+            None, _write, snapshot, filepath, handler, atomic, mode)
+
+    async def aload(self, filepath, handler=json.load, merge=True,
+                    new_only=True, signal=True, mode: str = 'r',
+                    chunk_size: int = 2 ** 10) -> Dict[Hashable, Any]:
+        """Load contents of file into self, without blocking the event loop.
+
+        As ‘load’, except that reading and parsing take place in the default
+        executor of the running loop. The parsed contents are then merged
+        into self in the loop, up to ‘chunk_size’ keys at a time, each chunk
+        in its own batch. Before each chunk, control passes to other tasks
+        until open streams of changes have room, and the chunk is cut to fit
+        the stream with the least room. See achanges.
+
+        Return the new contents, in a new dict.
+
+        """
+        import asyncio
+        contents = await asyncio.get_running_loop().run_in_executor(
+            None, _read, filepath, handler, mode)
+        pairs = list(contents.items()) if isinstance(contents, dict) \
+            else contents
+        new: Dict[Hashable, Any] = dict()
+        start = 0
+        while start < len(pairs):
+            for stream in self._streams:
+                await stream.drain()
+            size = min([chunk_size] + [s.room for s in self._streams])
+            if size > 0:
+                new.update(self.absorb(pairs[start:start + size],
+                                       merge=merge, new_only=new_only,
+                                       signal=signal))
+                start += size
+            await asyncio.sleep(0)
+        return new
+
+    def achanges(self, maxsize: int = 2 ** 10) -> 'ChangeStream':
+        """Return a new asynchronous iterator over signalled changes to self.
+
+        This must be called from a coroutine. For example:
+
+            async with kvs.achanges() as changes:
+                async for change in changes:
+                    print(change.key, change.kwargs)
+
+        See ChangeStream.
+
+        """
+        from .aio import ChangeStream
+        return ChangeStream(self, maxsize=maxsize)
+
+    def absorb(self, contents: Union[Dict[Hashable, Any],
+                                     Iterable[Tuple[Hashable, Any]]],
+               merge=True, new_only=True, signal=True) -> Dict[Hashable, Any]:
+        """Merge passed contents into self, as loaded from a file.
+
+        This is the back end of ‘load’. A passed dict is modified, removing
+        values that are not new if ‘new_only’ is true, and returned. Passed
+        key-value pairs are consumed one at a time, and those that are new are
+        returned in a new dict.
+
+        """
+        if isinstance(contents, dict):
+            new = contents
+            pairs: Iterable[Tuple[Hashable, Any]] = contents.items()
+        else:
+            new = dict()
+            pairs = contents
+        stale = list()
+
+        with self.batch():
+            for key, value in pairs:
+                if new_only and key in self and value == self[key]:
+                    # The value is not new. Ignore it.
+                    stale.append(key)
+                    continue
+                if merge:
+                    # Write to self.
+                    self[key] = value
+                if signal:
+                    # Signal change.
+                    self._signal(key, merge=merge, new_value=value)
+                if new is not contents:
+                    new[key] = value
+
+        if new is contents:
+            for key in stale:
+                del contents[key]
+        return new
+
+    def diff(self, other: Mapping) -> Patch:
+        """Return a patch that would make self equal to passed mapping.
+
+        This is O(n) in general, but only O(k) for k changes where ‘other’
+        is a fork of self.
+
+        """
+        if isinstance(other, KeyValueOverlay) and other.parent is self:
+            return other.changes()
+        get = self.get
+        return dict(set=[[k, v] for k, v in other.items()
+                         if get(k, _MISSING) != v],
+                    unset=[k for k in self if k not in other])
+
+    def apply(self, patch: Patch, signal=True) -> None:
+        """Apply passed patch, as from ‘diff’, to self.
+
+        Signal each change as ‘load’ and ‘clear’ would.
+
+        """
+        with self.batch():
+            if patch.get('clear'):
+                self.clear(signal=signal)
+            for key, value in patch['set']:
                 self[key] = value
-            if signal:
-                # Signal change.
-                self._signal(key, merge=merge, new_value=value)
+                if signal:
+                    # Signal change.
+                    self._signal(key, merge=True, new_value=value)
+            for key in patch['unset']:
+                if key not in self:
+                    continue
+                del self[key]
+                if signal:
+                    # Signal change.
+                    self._signal(key, reset=True)
+
+    def track(self) -> 'ChangeTracker':
+        """Start tracking changes to self. Return the tracker.
 
-        return contents
+        See ChangeTracker.
+
+        """
+        tracker = ChangeTracker(self)
+        self.observe(tracker)
+        return tracker
 
     def clear(self, signal=True) -> None:
-        """Extend parent method for signalling."""
+        """Remove all keys. Signal each removal."""
         prior_keys = set(self.keys())
-        super().clear()
+        self._clear()
+        for observer in self._observers:
+            observer.cleared()
         if signal:
             # Signal change.
-            for key in prior_keys:
-                self._signal(key, reset=True)
+            with self.batch():
+                for key in prior_keys:
+                    self._signal(key, reset=True)
 
     def _signal(self, key: Hashable, **kwargs) -> None:
         """Invite or provoke side effects by sending a signal.
 
         In this default implementation, this method sends a parameter-specific
-        signal using pydispatch. Interested parties must be connected by key
-        to receive such a signal.
-
-        The use of pydispatch here should be considered an implementation
-        detail and may change in a future version of Snisku.
+        signal using the current dispatcher of snisku.dispatch. Interested
+        parties must be connected by key to receive such a signal.
 
         The intended use of this method is to update a GUI with new values
         as they are loaded from a file.
 
+        If a batch is open, the signal is held instead, to be followed by a
+        CHANGED signal when the batch ends. See batch.
+
+        """
+        if self._held is not None:
+            self._held.pop(key, None)
+            self._held[key] = kwargs
+            return
+        dispatch.current.send(key, self, **kwargs)
+        for stream in self._streams:
+            stream.put(key, kwargs)
+
+    def _clear(self) -> None:
+        """Remove all keys, without notification."""
+        raise NotImplementedError()
+
+    def _dumpable(self) -> Any:
+        """Return an object for a dump handler to serialize."""
+        raise NotImplementedError()
+
+
+class KeyValueStore(BaseStore, dict):
+    """A dict with a few conveniences for serialization.
+
+    This is intended as a snapshot of primitive keys to primitive values. These
+    are not packaged for immediate use but rather intended for serialization,
+    transport and logging. For example, a Gunka unit may take a KeyValueStore
+    as one of its inputs.
+
+    Parameter objects get their values from a KeyValueStore at need. This
+    process may produce rich output, but a KeyValueStore cannot, by itself,
+    produce richer representations of its raw data.
+
+    """
+
+    def __setitem__(self, key, value) -> None:
+        """Extend parent method for observation."""
+        super().__setitem__(key, value)
+        for observer in self._observers:
+            observer.changed(key)
+
+    def __delitem__(self, key) -> None:
+        """Extend parent method for observation."""
+        super().__delitem__(key)
+        for observer in self._observers:
+            observer.changed(key)
+
+    def __ior__(self, other):
+        """Extend parent method for observation."""
+        self.update(other)
+        return self
+
+    def pop(self, key, *args) -> Any:
+        """Extend parent method for observation."""
+        if key not in self:
+            return super().pop(key, *args)
+        value = super().pop(key)
+        for observer in self._observers:
+            observer.changed(key)
+        return value
+
+    def popitem(self) -> Tuple[Hashable, Any]:
+        """Extend parent method for observation."""
+        key, value = super().popitem()
+        for observer in self._observers:
+            observer.changed(key)
+        return key, value
+
+    def setdefault(self, key, default=None) -> Any:
+        """Extend parent method for observation."""
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def update(self, *args, **kwargs) -> None:
+        """Extend parent method for observation."""
+        if not self._observers:
+            super().update(*args, **kwargs)
+            return
+        changes = dict(*args, **kwargs)
+        super().update(changes)
+        for key in changes:
+            for observer in self._observers:
+                observer.changed(key)
+
+    def _clear(self) -> None:
+        dict.clear(self)
+
+    def _dumpable(self) -> Any:
+        return self
+
+
+class KeyValueOverlay(BaseStore, MutableMapping):
+    """A copy-on-write layer over a parent key-value store.
+
+    Reads fall through to the parent for keys that have not been written or
+    removed in the layer. Writes and removals are kept in the layer and never
+    affect the parent. Removal of a key that exists in the parent leaves a
+    tombstone in the layer. Forking is therefore O(1), and the memory used by
+    a layer is proportional to its own changes.
+
+    Changes made to the parent after forking are visible through the layer,
+    for keys the layer has not touched. The layer does not signal them. Its
+    own changes are signalled with the layer as sender.
+
+    Iteration and ‘len’ are O(n) in the total number of keys. For
+    serialization, ‘dump’ works as for a KeyValueStore, via ‘flatten’.
+
+    """
+
+    def __init__(self, parent: MutableMapping) -> None:
+        """Initialize, over passed parent store."""
+        self.parent = parent
+        self._local: Dict[Hashable, Any] = dict()
+        self._opaque = False  # True after clearing: Stop falling through.
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self._local.get(key, _MISSING)
+        if value is _MISSING:
+            if self._opaque:
+                raise KeyError(key)
+            return self.parent[key]
+        if value is _TOMBSTONE:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: Any) -> bool:
+        value = self._local.get(key, _MISSING)
+        if value is _MISSING:
+            return not self._opaque and key in self.parent
+        return value is not _TOMBSTONE
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self._local[key] = value
+        for observer in self._observers:
+            observer.changed(key)
+
+    def __delitem__(self, key: Hashable) -> None:
+        if key not in self:
+            raise KeyError(key)
+        if not self._opaque and key in self.parent:
+            self._local[key] = _TOMBSTONE
+        else:
+            del self._local[key]
+        for observer in self._observers:
+            observer.changed(key)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        local = self._local
+        if not self._opaque:
+            for key in self.parent:
+                if key not in local:
+                    yield key
+        for key, value in local.items():
+            if value is not _TOMBSTONE:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Override parent method for speed."""
+        value = self._local.get(key, _MISSING)
+        if value is _MISSING:
+            if self._opaque:
+                return default
+            return self.parent.get(key, default)
+        if value is _TOMBSTONE:
+            return default
+        return value
+
+    def changes(self) -> Patch:
+        """Return a patch of the changes made in this layer.
+
+        Applied to the parent, the patch would make it equal to self.
+
         """
-        dispatcher.send(signal=key, sender=self, **kwargs)
+        if self._opaque:
+            return dict(set=[[k, v] for k, v in self._local.items()],
+                        unset=[k for k in self.parent if k not in self._local])
+        return dict(set=[[k, v] for k, v in self._local.items()
+                         if v is not _TOMBSTONE],
+                    unset=[k for k, v in self._local.items()
+                           if v is _TOMBSTONE])
+
+    def flatten(self) -> KeyValueStore:
+        """Return a new KeyValueStore with the contents of self."""
+        return KeyValueStore(self.items())
+
+    def _clear(self) -> None:
+        self._local.clear()
+        self._opaque = True
+
+    def _dumpable(self) -> Any:
+        return self.flatten()
+
+
+class ChangeTracker(object):
+    """An observer of the keys changed in a key-value store.
+
+    For repeated synchronization of stores, the tracker produces patches
+    without comparing every key, at a cost of O(1) per change.
+
+    """
+
+    def __init__(self, kvs: BaseStore) -> None:
+        """Initialize, with nothing changed yet in passed store."""
+        self.kvs = kvs
+        self.keys: Set[Hashable] = set()
+        self._cleared = False
+
+    def changed(self, key: Hashable) -> None:
+        self.keys.add(key)
+
+    def cleared(self) -> None:
+        self.keys.clear()
+        self._cleared = True
+
+    def patch(self, reset: bool = True) -> Patch:
+        """Return a patch of changes since the last reset.
+
+        After the store has been cleared, the patch removes all keys that are
+        not set. It can only do so when the receiving store is cleared too, so
+        its ‘unset’ list is not exact. Instead, the patch has an additional
+        item, ‘clear’, which is True.
+
+        With ‘reset’, start over with no changes.
+
+        """
+        kvs = self.kvs
+        patch: Patch = dict(set=[[k, kvs[k]] for k in self.keys if k in kvs],
+                            unset=[k for k in self.keys if k not in kvs])
+        if self._cleared:
+            patch['clear'] = True
+        if reset:
+            self.reset()
+        return patch
+
+    def reset(self) -> None:
+        """Forget changes so far."""
+        self.keys.clear()
+        self._cleared = False
+
+    def close(self) -> None:
+        """Stop tracking."""
+        self.kvs.unobserve(self)
+
+
+class ParseCache(object):
+    """A cache of parsed, validated values, for use with a KeyValueStore.
+
+    Entries are keyed by parameter. Each entry remembers the raw value it was
+    made from and is only used if the raw value presented on retrieval is that
+    very object. A parameter’s parser and validator are meant to be pure
+    functions, so an identical raw value will always produce the same result.
+
+    Failures to parse or validate are not cached.
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize. Start with no entries and zeroed counters."""
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Any, Tuple[Any, Any]] = dict()
+        self._by_key: Dict[Hashable, Set[Any]] = dict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def retrieve(self, parameter, raw: Any) -> Any:
+        """Return a parsed, validated value of passed raw value for parameter.
+
+        Parse and validate only if there is no current cache entry.
+
+        """
+        entry = self._entries.get(parameter)
+        if entry is not None and entry[0] is raw:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        refined = parameter.parse_and_validate(raw)
+        self.store(parameter, raw, refined)
+        return refined
+
+    def try_retrieve(self, parameter, raw: Any) -> Result:
+        """As ‘retrieve’, but return a Result instead of raising."""
+        entry = self._entries.get(parameter)
+        if entry is not None and entry[0] is raw:
+            self.hits += 1
+            return Result(entry[1])
+
+        self.misses += 1
+        result = parameter.try_parse_and_validate(raw)
+        if result:
+            self.store(parameter, raw, result.value)
+        return result
+
+    def store(self, parameter, raw: Any, refined: Any) -> None:
+        """Add an entry for a raw value already parsed and validated."""
+        self._entries[parameter] = (raw, refined)
+        self._by_key.setdefault(parameter.key, set()).add(parameter)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop all entries for parameters with passed key."""
+        for parameter in self._by_key.pop(key, ()):
+            del self._entries[parameter]
+
+    def clear(self) -> None:
+        """Drop all entries. Keep counters."""
+        self._entries.clear()
+        self._by_key.clear()
+
+    # Observation of a KeyValueStore.
+    changed = invalidate
+    cleared = clear
+
+
+############
+# INTERNAL #
+############
+
+
+# Attributes of BaseStore that are not part of the contents of a store.
+_HOOKS = frozenset({'parse_cache', '_observers', '_streams', '_held'})
+
+
+# Markers for a key removed from an overlay, and for a key not in a layer.
+_TOMBSTONE = object()
+_MISSING = object()
+
+
+def _write(contents: Any, filepath, handler, atomic: bool, mode: str) -> None:
+    """Dump passed contents to named file. See BaseStore.dump."""
+    if atomic:
+        write_atomically(filepath, partial(handler, contents), mode=mode)
+        return
+    with open(filepath, mode=mode) as f:
+        handler(contents, f)
+
+
+def _read(filepath, handler, mode: str) -> Any:
+    """Return a dict or a list of key-value pairs from named file."""
+    with open(filepath, mode=mode) as f:
+        contents = handler(f)
+        if isinstance(contents, dict):
+            return contents
+        return list(contents)
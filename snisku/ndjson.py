@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Streaming serialization of key-value stores as newline-delimited JSON.
+
+Each line of a file in this format is a JSON array of one key and its value.
+The functions here are handlers for KeyValueStore.dump and load:
+
+    kvs.dump(filepath, handler=snisku.ndjson.dump)
+    kvs.load(filepath, handler=snisku.ndjson.load)
+
+Unlike with plain JSON, loading processes one record at a time and never holds
+the whole file, and dumping writes a chunk of records at a time. Unlike plain
+JSON objects, records preserve keys that are not strings, if they survive a
+round trip through JSON, such as integers.
+
+"""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+import json
+from typing import Any
+from typing import IO
+from typing import Iterator
+from typing import Mapping
+from typing import Tuple
+
+
+#############
+# INTERFACE #
+#############
+
+
+def dump(obj: Mapping, f: IO, chunk_size: int = 2 ** 10) -> None:
+    """Write passed mapping to passed file object, in chunks of records."""
+    encode = json.JSONEncoder().encode
+    chunk = list()
+    for item in obj.items():
+        chunk.append(encode(item))
+        if len(chunk) >= chunk_size:
+            chunk.append('')
+            f.write('\n'.join(chunk))
+            chunk.clear()
+    if chunk:
+        chunk.append('')
+        f.write('\n'.join(chunk))
+
+
+def load(f: IO) -> Iterator[Tuple[Any, Any]]:
+    """Generate key-value pairs from passed file object. Skip blank lines."""
+    decode = json.JSONDecoder().decode
+    for number, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            key, value = decode(line)
+        except ValueError as e:
+            raise ValueError('Bad record on line {}.'.format(number)) from e
+        yield key, value
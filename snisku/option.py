@@ -14,7 +14,12 @@ ExhaustiveParameter) are the only values permitted.
 
 # Standard library:
 from dataclasses import dataclass
+from dataclasses import fields
 from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
 from typing import Tuple
 
 # Local:
@@ -42,9 +47,64 @@ class Option(object):
 
     """
 
+    __slots__ = ('value', 'ui', '__weakref__')
+
     value: Any
     ui: Any
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # Include the fields of any subclass.
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        # Bypass the immutability of a frozen dataclass, as its own
+        # initializer does.
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+
+class OptionIndex(object):
+    """A lookup table of options by value.
+
+    Options with hashable values are looked up in O(1) time. Options with
+    unhashable values, and unhashable candidate values, fall back to a linear
+    scan by equality. Where several options have equal values, the first one
+    wins, as in a linear scan.
+
+    The index is a snapshot. It does not follow later changes to the iterable
+    of options it was made from.
+
+    """
+
+    __slots__ = ('_options', '_hashed', '_unhashable')
+
+    def __init__(self, options: Iterable[Option]) -> None:
+        """Initialize. Sort passed options by hashability of their values."""
+        self._options = tuple(options)
+        self._hashed: Dict[Any, Option] = dict()
+        self._unhashable: List[Option] = list()
+        for option in self._options:
+            try:
+                self._hashed.setdefault(option.value, option)
+            except TypeError:
+                self._unhashable.append(option)
+
+    def __contains__(self, value: Any) -> bool:
+        return self.get(value) is not None
+
+    def get(self, value: Any, default: Any = None) -> Optional[Option]:
+        """Return the first option with passed value, else default."""
+        try:
+            return self._hashed[value]
+        except KeyError:
+            candidates: Iterable[Option] = self._unhashable
+        except TypeError:
+            candidates = self._options
+        for option in candidates:
+            if option.value == value:
+                return option
+        return default
+
 
 class OptionParameter(BaseParameter):
     """A parameter that can have options.
@@ -56,27 +116,67 @@ class OptionParameter(BaseParameter):
     final button includes an editor for setting an arbitrary value matching
     none of the options in self.options.
 
+    A tuple of options is indexed by value when assigned. Reassign
+    self.options to update the index. Options in another type of sequence,
+    which may be mutated in place, are scanned on each lookup instead.
+
     """
 
+    __slots__ = ('_options', '_option_index')
+
     def __init__(self, options: Tuple[Option, ...] = (), **kwargs) -> None:
         """Initialize."""
         self.options = options
         super().__init__(**kwargs)
 
+    @property
+    def options(self) -> Tuple[Option, ...]:
+        return self._options
+
+    @options.setter
+    def options(self, options: Tuple[Option, ...]) -> None:
+        self._options = options
+        self._option_index = OptionIndex(options) \
+            if isinstance(options, tuple) else None
+
+    def option_for(self, value: Any) -> Option:
+        """Look up an option by its value. O(1) for hashable values in a tuple.
+
+        Raise KeyError if there is no such option.
+
+        """
+        option = self._find(value)
+        if option is None:
+            raise KeyError('Value ‘{!r}’ is not an option for ‘{}’.'
+                           .format(value, self.key))
+        return option
+
+    def _find(self, value: Any) -> Optional[Option]:
+        """Return the first option with passed value, else None."""
+        index = self._option_index
+        if index is not None:
+            return index.get(value)
+        for option in self._options:
+            if option.value == value:
+                return option
+        return None
+
 
 class ExhaustiveParameter(OptionParameter):
     """A parameter that allows only its registered options’ values."""
 
+    __slots__ = ()
+
     def __init__(self, validator: Validator = None,
                  **kwargs: Any) -> None:
-        """Initialize. Require options. Make a default validator."""
-        if validator is None:
-            def validator(value: Any) -> bool:
-                return any((value == o.value for o in self.options))
-
-        super().__init__(validator=validator, **kwargs)
+        """Initialize. Require options. Default to validation by option."""
+        super().__init__(validator=validator or self.is_option, **kwargs)
         assert self.options
 
+    def is_option(self, value: Any) -> bool:
+        """Return True if passed value is the value of an option."""
+        return self._find(value) is not None
+
 
 # An example of an Option: The value None, as used for disabling a parameter.
 none = Option(None, UserInterfacePresenter(name='Disabled'))
@@ -9,14 +9,18 @@
 # Standard:
 from typing import Any
 from typing import Callable
+from typing import Dict
 from typing import Hashable
-
-# Third party:
-from pydispatch import dispatcher
+from typing import Iterable
+from typing import Tuple
+from typing import Type
 
 # Local:
+from . import dispatch
 from .exc import ParameterError
 from .exc import ParserError
+from .exc import Result
+from .kvs import BaseStore
 from .kvs import KeyValueStore
 from .exc import ValidatorError
 from .exc import ValidationFailure
@@ -33,6 +37,16 @@ Dumper = Callable[[Any], Hashable]
 Validator = Callable[[Any], bool]
 
 
+def identity(value: Any) -> Any:
+    """Return passed value. This is the default parser and dumper."""
+    return value
+
+
+def always(value: Any) -> bool:
+    """Return True. This is the default validator."""
+    return True
+
+
 class BaseParameter(object):
     """A model of a parameter known to and needed in an application.
 
@@ -42,15 +56,22 @@ class BaseParameter(object):
     presented with a key-value store that is mutually independent of the
     parameter.
 
+    Parameters, and their subclasses in Snisku, have slots instead of a
+    ‘__dict__’, to save memory where there are many. A subclass without its
+    own ‘__slots__’ gets a ‘__dict__’ as usual.
+
     """
 
+    __slots__ = ('key', 'ui', 'default', 'parser', 'dumper', 'validator',
+                 '__weakref__')
+
     def __init__(self,
                  key: Hashable = None,
                  ui: Any = None,
                  default: Any = None,
-                 parser: Parser = lambda v: v,
-                 dumper: Dumper = lambda v: v,
-                 validator: Validator = lambda v: True) -> None:
+                 parser: Parser = identity,
+                 dumper: Dumper = identity,
+                 validator: Validator = always) -> None:
         """Initialize.
 
         Terse help with arguments:
@@ -99,6 +120,8 @@ class BaseParameter(object):
           checked in the ‘default_is_valid’ method.
 
         * The default ‘parser’ and ‘dumper’ are the identity function.
+          Parameters are picklable, for use with multiprocessing, if their
+          parsers, dumpers and validators are, which rules out lambdas.
           These callables are applied only to values, not keys, and should be
           unary, pure functions (free of state and side effects) because they
           are public attributes and may be called outside of setting and
@@ -140,27 +163,86 @@ class BaseParameter(object):
                            validator: Validator = None) -> Any:
         """Parse and validate passed value.
 
-        Return a valid value for self or raise ParameterError.
+        Return a valid value for self or raise ParameterError, as described
+        by ‘try_parse_and_validate’.
 
         """
         parser = parser or self.parser
         validator = validator or self.validator
 
+        # As in _refine, except that a valid value is returned without
+        # building a Result.
         try:
             refined = parser(value)
         except Exception as e:
-            s = 'Could not parse ‘{!r}’ as a value for ‘{}’.'
-            raise ParserError(s.format(value, self.key)) from e
+            return Result(value, ParserError, e, self.key).unwrap()
 
         try:
-            if validator(refined):
-                return refined
+            valid = validator(refined)
         except Exception as e:
-            s = 'Could not validate ‘{!r}’ as a value for ‘{}’.'
-            raise ValidatorError(s.format(refined, self.key)) from e
-        else:
-            s = 'Value ‘{!r}’ is not valid for ‘{}’.'
-            raise ValidationFailure(s.format(refined, self.key))
+            return Result(refined, ValidatorError, e, self.key).unwrap()
+        if valid:
+            return refined
+        return Result(refined, ValidationFailure, None, self.key).unwrap()
+
+    def try_parse_and_validate(self, value: Any, parser: Parser = None,
+                               validator: Validator = None) -> Result:
+        """Parse and validate passed value, without raising ParameterError.
+
+        Return a Result. Where many values are invalid, this is faster than
+        ‘parse_and_validate’, which builds an exception for each.
+
+        """
+        return self._refine(value, parser or self.parser,
+                            validator or self.validator)
+
+    def parse_and_validate_many(self, values: Iterable[Any]
+                                ) -> Tuple[Any, Dict[int, Type[Exception]]]:
+        """Parse and validate each of passed values, without raising.
+
+        Return a sequence of refined values, and the class of each exception
+        that ‘parse_and_validate’ would raise, by index. The refined values
+        at those indices are meaningless.
+
+        Where NumPy is installed, the parser is ‘int’ or ‘float’ and the
+        values form a one-dimensional numeric array, parsing is vectorized
+        and the sequence returned is a NumPy array. Validation is vectorized
+        too if the validator has a ‘many’ method, as does
+        snisku.types.Range. Otherwise, values are treated one at a time and
+        the sequence returned is a list.
+
+        """
+        refined = _parse_many(self.parser, values)
+        if refined is None:
+            results = list()
+            failures: Dict[int, Type[Exception]] = dict()
+            for index, value in enumerate(values):
+                result = self.try_parse_and_validate(value)
+                if result:
+                    results.append(result.value)
+                else:
+                    results.append(None)
+                    failures[index] = result.error
+            return results, failures
+
+        if self.validator is always:
+            return refined, dict()
+
+        many = getattr(self.validator, 'many', None)
+        try:
+            valid = many(refined) if many else None
+        except Exception:
+            valid = None
+        if valid is None:
+            failures = dict()
+            for index, value in enumerate(refined.tolist()):
+                result = self.try_parse_and_validate(value, parser=identity)
+                if not result:
+                    failures[index] = result.error
+            return refined, failures
+
+        return refined, {int(i): ValidationFailure
+                         for i in _numpy().flatnonzero(~valid)}
 
     def default_is_valid(self, **kwargs) -> bool:
         """Return True if the built-in default is valid.
@@ -180,13 +262,31 @@ class BaseParameter(object):
     def retrieve(self, kvs: KeyValueStore, **kwargs) -> Any:
         """Retrieve a value for self from passed key-value store.
 
-        This triggers parsing and validation. Return a valid value for self or
-        raise ParameterError.
+        This triggers parsing and validation, unless the key-value store has
+        a parse cache with a current value for self. Overriding the parser or
+        validator through keyword arguments bypasses any such cache. Return a
+        valid value for self or raise ParameterError.
+
+        """
+        assert kvs is not None
+        raw = kvs.get(self.key, self.default)
+        cache = getattr(kvs, 'parse_cache', None)
+        if cache is None or kwargs:
+            return self.parse_and_validate(raw, **kwargs)
+        return cache.retrieve(self, raw)
+
+    def try_retrieve(self, kvs: KeyValueStore, **kwargs) -> Result:
+        """Retrieve a value for self, without raising ParameterError.
+
+        Return a Result. See ‘retrieve’ and ‘try_parse_and_validate’.
 
         """
         assert kvs is not None
-        return self.parse_and_validate(kvs.get(self.key, self.default),
-                                       **kwargs)
+        raw = kvs.get(self.key, self.default)
+        cache = getattr(kvs, 'parse_cache', None)
+        if cache is None or kwargs:
+            return self.try_parse_and_validate(raw, **kwargs)
+        return cache.try_retrieve(self, raw)
 
     def store(self, kvs: KeyValueStore, value: Any, dumper: Dumper = None,
               signal: bool = True) -> None:
@@ -218,19 +318,83 @@ class BaseParameter(object):
                 # Signal change.
                 self._signal(kvs, reset=True)
 
+    def _refine(self, value: Any, parser: Parser,
+                validator: Validator) -> Result:
+        """Parse and validate passed value. Return a Result."""
+        try:
+            refined = parser(value)
+        except Exception as e:
+            return Result(value, ParserError, e, self.key)
+
+        try:
+            valid = validator(refined)
+        except Exception as e:
+            return Result(refined, ValidatorError, e, self.key)
+        if valid:
+            return Result(refined)
+        return Result(refined, ValidationFailure, None, self.key)
+
     def _signal(self, kvs, **kwargs):
         """Invite or provoke side effects by sending a signal.
 
         In this default implementation, this method sends a parameter-specific
-        signal using pydispatch.
-
-        The use of pydispatch here should be considered an implementation
-        detail and may change in a future version of Snisku.
+        signal using the current dispatcher of snisku.dispatch.
 
         The intended uses of this method include saving settings to a file.
         For that reason, the key-value store, not the parameter, is passed as
         the sender of the signal. Doing so enables subscription of changes to
         the store without making strict requirements upon the store.
 
+        Where the store is a BaseStore, such as a KeyValueStore, signalling is
+        delegated to the store, so that it can be batched.
+
         """
-        dispatcher.send(signal=self.key, sender=kvs, **kwargs)
+        if isinstance(kvs, BaseStore):
+            kvs._signal(self.key, **kwargs)
+        else:
+            dispatch.current.send(self.key, kvs, **kwargs)
+
+
+############
+# INTERNAL #
+############
+
+
+def _numpy() -> Any:
+    """Return the NumPy module, or None if it is not installed.
+
+    NumPy is imported at need, because importing it is slow.
+
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _parse_many(parser: Parser, values: Iterable[Any]) -> Any:
+    """Return passed values parsed as a NumPy array, or None.
+
+    None is returned where the values cannot be parsed in one vectorized
+    operation with the same result as ‘parser’ applied to each value.
+
+    """
+    if parser is not int and parser is not float:
+        return None
+    numpy = _numpy()
+    if numpy is None:
+        return None
+    try:
+        array = numpy.asarray(values)
+    except ValueError:
+        return None
+    kind = array.dtype.kind
+    if array.ndim != 1 or kind not in 'biuf':
+        return None
+    if parser is int:
+        if kind == 'f' or (kind == 'u' and array.dtype.itemsize >= 8):
+            # Truncation of floats and wrapping of large integers differ.
+            return None
+        return array.astype(numpy.int64)
+    return array.astype(numpy.float64)
@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""Persistence of key-value stores to files, beyond a simple dump."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+import atexit
+import json
+import os
+import shutil
+import stat
+import threading
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import IO
+from typing import Optional
+from typing import Tuple
+
+
+#############
+# INTERFACE #
+#############
+
+
+def write_atomically(filepath, write: Callable[[IO], Any],
+                     mode: str = 'w') -> None:
+    """Call ‘write’ with a file object that replaces named file on success.
+
+    The file object refers to a temporary file in the same directory as the
+    named file. After ‘write’ returns, the temporary file is synced to disk and
+    renamed over the named file, which is therefore never incomplete.
+
+    """
+    path = os.fspath(filepath)
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temporary = _create_temporary(directory, name)
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(temporary, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass  # Keep the permissions of a new file.
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.unlink(temporary)
+        except FileNotFoundError:
+            pass
+        raise
+    _sync_directory(directory)
+
+
+class Autosaver(object):
+    """A debounced, atomic saver of a key-value store to a file.
+
+    The autosaver observes the store for mutation. After a change, it waits
+    ‘interval’ seconds for further changes before it saves a snapshot of the
+    store from a background thread. It therefore writes at most once per
+    interval, however many changes are made.
+
+    Pending changes are also saved at interpreter exit. An error in saving
+    from the background thread is stored as ‘error’ and the save is retried
+    after another interval.
+
+    """
+
+    def __init__(self, kvs, filepath, interval: float = 1.0,
+                 handler=json.dump, mode: str = 'w') -> None:
+        """Initialize. Start observing passed store and a background thread.
+
+        ‘handler’ and ‘mode’ are as for KeyValueStore.dump and
+        write_atomically respectively.
+
+        """
+        self.kvs = kvs
+        self.filepath = filepath
+        self.interval = interval
+        self.handler = handler
+        self.mode = mode
+        self.error: Optional[Exception] = None
+
+        self._dirty = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name='snisku-autosave')
+        self._thread.start()
+        atexit.register(self.flush)
+        kvs.observe(self)
+
+    def changed(self, key: Any) -> None:
+        """Note a change to the store."""
+        if not self._dirty:
+            with self._condition:
+                self._dirty = True
+                self._condition.notify()
+
+    def cleared(self) -> None:
+        """Note a change to the store."""
+        self.changed(None)
+
+    def flush(self) -> None:
+        """Save pending changes now, in the calling thread."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            snapshot = dict(self.kvs)
+            try:
+                write_atomically(self.filepath,
+                                 lambda f: self.handler(snapshot, f),
+                                 mode=self.mode)
+            except Exception:
+                self._dirty = True
+                raise
+            self.error = None
+
+    def close(self) -> None:
+        """Save pending changes, stop observing and stop the thread."""
+        self.kvs.unobserve(self)
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        atexit.unregister(self.flush)
+        self.flush()
+
+    def _run(self) -> None:
+        """Save changes in the background until closed."""
+        while True:
+            with self._condition:
+                while not (self._dirty or self._closed):
+                    self._condition.wait()
+                # Let further changes accumulate.
+                self._condition.wait_for(lambda: self._closed, self.interval)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                self.error = e
+
+
+class Journal(object):
+    """An append-only log of changes to a key-value store, over a checkpoint.
+
+    The checkpoint is a JSON dump of the store at ‘filepath’, readable by
+    KeyValueStore.load. Each change to the store after the checkpoint is
+    appended as one line of JSON to a log file next to it, with a ‘.log’
+    suffix. Persisting a change therefore costs O(1), not O(n) as in a dump.
+
+    When the log grows past ‘threshold’ bytes, it is set aside and a new
+    checkpoint is written from a background thread, after which the old log is
+    deleted. A crash at any point leaves a checkpoint and logs that replay to
+    the last change recorded. Records are flushed to the operating system as
+    they are written. With ‘sync’, they are also synced to disk, at a cost.
+
+    An error in writing a checkpoint from the background thread is stored as
+    ‘error’. The old log is then kept, and the next log set aside is added to
+    it, until a checkpoint is written.
+
+    As with a JSON dump, keys must be strings.
+
+    """
+
+    def __init__(self, kvs, filepath, threshold: int = 2 ** 20,
+                 sync: bool = False, signal: bool = True) -> None:
+        """Initialize. Replay any existing journal into passed store.
+
+        Write a fresh checkpoint and start observing the store.
+
+        """
+        self.kvs = kvs
+        self.filepath = os.fspath(filepath)
+        self.threshold = threshold
+        self.sync = sync
+        self.error: Optional[Exception] = None
+
+        self._lock = threading.RLock()
+        self._log: Optional[IO] = None
+        self._size = 0
+        # True while a checkpoint is being written. See _wait.
+        self._compacting = False
+        self._idle = threading.Condition(self._lock)
+
+        kvs.absorb(self.replay(self.filepath), signal=signal)
+        self._checkpoint(dict(kvs))
+        try:
+            os.unlink(self.filepath + _LOG)
+        except FileNotFoundError:
+            pass
+        self._log = open(self.filepath + _LOG, mode='a')
+        kvs.observe(self)
+
+    @staticmethod
+    def replay(filepath) -> Dict[str, Any]:
+        """Return the contents of the journal at named file, as a dict.
+
+        A torn final record, as from a crash during writing, is ignored.
+
+        """
+        filepath = os.fspath(filepath)
+        try:
+            with open(filepath, mode='r') as f:
+                contents = json.load(f)
+        except FileNotFoundError:
+            contents = dict()
+
+        for log in (filepath + _OLD_LOG, filepath + _LOG):
+            try:
+                f = open(log, mode='r')
+            except FileNotFoundError:
+                continue
+            with f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    if len(record) == 2:
+                        contents[record[0]] = record[1]
+                    elif record:
+                        contents.pop(record[0], None)
+                    else:
+                        contents.clear()
+        return contents
+
+    def changed(self, key: str) -> None:
+        """Record a change to passed key: A new value, or removal."""
+        try:
+            record = [key, self.kvs[key]]
+        except KeyError:
+            record = [key]
+        self._append(record)
+
+    def cleared(self) -> None:
+        """Record the removal of all keys."""
+        self._append([])
+
+    def compact(self) -> None:
+        """Write a new checkpoint and truncate the log, in this thread."""
+        with self._lock:
+            self._wait()
+            self._rotate()
+            snapshot = dict(self.kvs)
+            self._compacting = True
+        try:
+            self._checkpoint(snapshot)
+        finally:
+            self._finish()
+        self.error = None
+
+    def close(self) -> None:
+        """Stop observing the store. Finish any compaction. Close the log."""
+        self.kvs.unobserve(self)
+        with self._lock:
+            self._wait()
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def _append(self, record: list) -> None:
+        line = json.dumps(record) + '\n'
+        with self._lock:
+            self._log.write(line)
+            self._log.flush()
+            if self.sync:
+                os.fsync(self._log.fileno())
+            self._size += len(line)
+            if self._size > self.threshold and not self._compacting:
+                self._rotate()
+                self._compacting = True
+                threading.Thread(target=self._compact, args=(dict(self.kvs),),
+                                 daemon=True, name='snisku-journal').start()
+
+    def _rotate(self) -> None:
+        """Set the current log aside and start a new one.
+
+        If an old log remains from a failed checkpoint, add the current log to
+        it. A crash while doing so leaves records in both logs, which replay
+        to the same result as if they were in either.
+
+        """
+        self._log.close()
+        log, old = self.filepath + _LOG, self.filepath + _OLD_LOG
+        if os.path.exists(old):
+            with open(log, mode='r') as source, open(old, mode='a') as target:
+                shutil.copyfileobj(source, target)
+                target.flush()
+                os.fsync(target.fileno())
+            os.unlink(log)
+        else:
+            os.replace(log, old)
+        self._log = open(log, mode='a')
+        self._size = 0
+
+    def _compact(self, snapshot: Dict[str, Any]) -> None:
+        """Write a checkpoint in the background. Store any error."""
+        try:
+            self._checkpoint(snapshot)
+        except Exception as e:
+            self.error = e
+        else:
+            self.error = None
+        finally:
+            self._finish()
+
+    def _checkpoint(self, snapshot: Dict[str, Any]) -> None:
+        """Write a checkpoint. Delete the log it supersedes."""
+        write_atomically(self.filepath, lambda f: json.dump(snapshot, f))
+        try:
+            os.unlink(self.filepath + _OLD_LOG)
+        except FileNotFoundError:
+            pass
+
+    def _finish(self) -> None:
+        """Note the end of a checkpoint begun with ‘_compacting’ set."""
+        with self._idle:
+            self._compacting = False
+            self._idle.notify_all()
+
+    def _wait(self) -> None:
+        """Wait for any checkpoint in progress.
+
+        One checkpoint is written at a time, and no log is set aside while it
+        is written, so that checkpoints are written in the order of their
+        snapshots, and each deletes only the log it supersedes.
+
+        """
+        with self._idle:
+            while self._compacting:
+                self._idle.wait()
+
+
+############
+# INTERNAL #
+############
+
+
+# Suffixes of journal log files.
+_LOG = '.log'
+_OLD_LOG = '.log.old'
+
+
+def _create_temporary(directory: str, name: str) -> Tuple[int, str]:
+    """Create a new, uniquely named file for writing. Return fd and path.
+
+    The file is created with the permissions of any new file, as limited by
+    the umask, to be kept if the named file does not yet exist.
+
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    while True:
+        path = os.path.join(directory, '.{}.{}.tmp'.format(
+            name, os.urandom(6).hex()))
+        try:
+            return os.open(path, flags, 0o666), path
+        except FileExistsError:
+            continue
+
+
+def _sync_directory(directory: str) -> None:
+    """Sync a directory entry to disk, where supported."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
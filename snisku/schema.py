@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+"""Collections of parameters, for reading many values at once."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+from collections import deque
+from functools import lru_cache
+from itertools import islice
+from keyword import iskeyword
+import os
+from typing import Any
+from typing import Dict
+from typing import Hashable
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+
+# Local:
+from .exc import InvalidContents
+from .exc import ParameterError
+from .param import BaseParameter
+
+
+#############
+# INTERFACE #
+#############
+
+
+class Snapshot(object):
+    """An immutable record of parameter values, read from a key-value store.
+
+    This is a base class. ParameterSet generates a subclass of it for each
+    set of names in a schema, with one slot per parameter, named as in the
+    schema. Snapshots can be copied, pickled and hashed. A snapshot is hashable
+    if its values are.
+
+    """
+
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError('Snapshot is immutable.')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError('Snapshot is immutable.')
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    def __hash__(self) -> int:
+        return hash(tuple(getattr(self, n) for n in self._fields))
+
+    def __copy__(self) -> 'Snapshot':
+        return self
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        values = tuple(getattr(self, n) for n in self._fields)
+        return _make_snapshot, (self._fields, values)
+
+    def __repr__(self) -> str:
+        pairs = ('{}={!r}'.format(n, getattr(self, n)) for n in self._fields)
+        return '{}({})'.format(type(self).__name__, ', '.join(pairs))
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a new dict of parameter values by name."""
+        return {name: getattr(self, name) for name in self._fields}
+
+
+class ParameterSet(object):
+    """A schema: An ordered collection of parameters with distinct keys.
+
+    Like a parameter, a ParameterSet is stateless with respect to values. It
+    is intended to be defined once, at module level, and used to read a
+    consistent snapshot of all its parameters from a key-value store.
+
+    A ParameterSet is picklable if its parameters are. Its snapshot class is
+    made on first use, and anew after parameters are added or unpickled.
+
+    """
+
+    def __init__(self, *parameters: BaseParameter,
+                 **named: BaseParameter) -> None:
+        """Initialize.
+
+        Positional parameters are named for their keys, which must then be
+        strings usable as Python identifiers. Keyword arguments name their
+        parameters explicitly, for keys that are not such strings.
+
+        Raise ValueError on a duplicate key or an unusable name.
+
+        """
+        self._by_name: Dict[str, BaseParameter] = dict()
+        self._by_key: Dict[Hashable, BaseParameter] = dict()
+        self._snapshot_class: Optional[type] = None
+        self._slots: Tuple[Any, ...] = ()
+        self.add(*parameters, **named)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._by_key
+
+    def __iter__(self) -> Iterator[BaseParameter]:
+        return iter(self._by_key.values())
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def __getitem__(self, key: Hashable) -> BaseParameter:
+        """Look up a parameter by its key."""
+        return self._by_key[key]
+
+    def add(self, *parameters: BaseParameter,
+            **named: BaseParameter) -> None:
+        """Add parameters, named as for __init__.
+
+        Raise ValueError on a duplicate key or an unusable name. Parameters
+        passed before the offending one are kept.
+
+        """
+        try:
+            for parameter in parameters:
+                self._add_positional(parameter)
+            for name, parameter in named.items():
+                self._add(name, parameter)
+        finally:
+            self._snapshot_class = None
+
+    @property
+    def snapshot_class(self) -> type:
+        """Return the class of snapshots, made as needed."""
+        if self._snapshot_class is None:
+            self._make_snapshot_class()
+        return self._snapshot_class
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['_snapshot_class'] = None
+        state['_slots'] = ()
+        return state
+
+    def retrieve_all(self, kvs: Mapping) -> Snapshot:
+        """Retrieve a value for each parameter from passed key-value store.
+
+        Return an instance of self.snapshot_class or raise ParameterError on
+        the first parameter with an invalid value.
+
+        As with BaseParameter.retrieve, any parse cache on the key-value store
+        is used.
+
+        """
+        assert kvs is not None
+        get = kvs.get
+        cache = getattr(kvs, 'parse_cache', None)
+
+        snapshot = object.__new__(self.snapshot_class)
+        if cache is None:
+            for slot, p in zip(self._slots, self._by_name.values()):
+                slot.__set__(snapshot,
+                             p.parse_and_validate(get(p.key, p.default)))
+        else:
+            for slot, p in zip(self._slots, self._by_name.values()):
+                slot.__set__(snapshot,
+                             cache.retrieve(p, get(p.key, p.default)))
+        return snapshot
+
+    def validate(self, kvs: Mapping) -> Dict[Hashable, ParameterError]:
+        """Retrieve a value for each parameter from passed key-value store.
+
+        Return the exception raised for each parameter with an invalid value,
+        by key, instead of raising the first of them.
+
+        """
+        failures = dict()
+        for parameter in self._by_key.values():
+            try:
+                parameter.retrieve(kvs)
+            except ParameterError as e:
+                failures[parameter.key] = e
+        return failures
+
+    def refine(self, contents: Mapping) -> Dict[Hashable, Any]:
+        """Parse and validate values in passed contents, by key.
+
+        Return parsed values for the keys in self. Ignore other keys. Raise
+        InvalidContents with the exceptions raised for all invalid values.
+
+        """
+        by_key = self._by_key
+        refined = dict()
+        failures = dict()
+        for key, raw in contents.items():
+            parameter = by_key.get(key)
+            if parameter is None:
+                continue
+            try:
+                refined[key] = parameter.parse_and_validate(raw)
+            except ParameterError as e:
+                failures[key] = e
+        if failures:
+            raise InvalidContents(failures)
+        return refined
+
+    def _make_snapshot_class(self) -> None:
+        names = tuple(self._by_name)
+        cls = _snapshot_class(names)
+        self._slots = tuple(getattr(cls, n) for n in names)
+        self._snapshot_class = cls
+
+    def _add_positional(self, parameter: BaseParameter) -> None:
+        self._add(parameter.key, parameter)
+
+    def _add(self, name: str, parameter: BaseParameter) -> None:
+        if not (isinstance(name, str) and name.isidentifier()):
+            raise ValueError('Parameter name ‘{!r}’ is not an identifier.'
+                             .format(name))
+        if iskeyword(name) or name.startswith('_') or hasattr(Snapshot, name):
+            raise ValueError('Parameter name ‘{}’ is reserved.'.format(name))
+        if name in self._by_name:
+            raise ValueError('Duplicate parameter name ‘{}’.'.format(name))
+        if parameter.key in self._by_key:
+            raise ValueError('Duplicate parameter key ‘{!r}’.'
+                             .format(parameter.key))
+        self._by_name[name] = parameter
+        self._by_key[parameter.key] = parameter
+
+
+class Registry(ParameterSet):
+    """A schema that also accepts parameters with keys that are not names.
+
+    A parameter passed positionally is indexed by its key, whatever the key
+    is. If the key is not usable as a name, the parameter is left out of
+    snapshots, but it is still validated, refined and looked up by key.
+
+    """
+
+    def _add_positional(self, parameter: BaseParameter) -> None:
+        key = parameter.key
+        if _is_name(key):
+            self._add(key, parameter)
+            return
+        if key in self._by_key:
+            raise ValueError('Duplicate parameter key ‘{!r}’.'.format(key))
+        self._by_key[key] = parameter
+
+
+# A global registry, for applications that would rather register each
+# parameter where it is defined than collect parameters in one place.
+REGISTRY = Registry()
+
+
+def validate_stores(schema: ParameterSet, stores: Iterable[Mapping],
+                    workers: Optional[int] = None, chunk_size: int = 2 ** 6
+                    ) -> Iterator[Tuple[int, Dict[Hashable, ParameterError]]]:
+    """Validate each of passed key-value stores against passed schema.
+
+    Generate a pair for each store, in order: Its index, and the failures
+    found by ParameterSet.validate, by key. An exception from a worker loses
+    its ‘__cause__’ in transit, but not its message.
+
+    Stores are validated by ‘workers’ processes, by default one per CPU,
+    in chunks of ‘chunk_size’ stores. Stores are consumed, and results
+    generated, as work progresses, with a bounded number of chunks in flight.
+    The schema and the stores must be picklable. With one worker, stores are
+    validated in this process instead.
+
+    """
+    if workers == 1:
+        for index, kvs in enumerate(stores):
+            yield index, schema.validate(kvs)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    workers = workers or os.cpu_count() or 1
+    iterator = iter(stores)
+    index = 0
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_initialize_worker,
+                             initargs=(schema,)) as executor:
+        pending: deque = deque()
+        try:
+            while True:
+                chunk = list(islice(iterator, chunk_size))
+                if chunk:
+                    pending.append(executor.submit(_validate_chunk, chunk))
+                if not pending:
+                    break
+                if chunk and len(pending) < 2 * workers:
+                    continue
+                for failures in pending.popleft().result():
+                    yield index, failures
+                    index += 1
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+############
+# INTERNAL #
+############
+
+
+@lru_cache(maxsize=None)
+def _snapshot_class(names: Tuple[str, ...]) -> type:
+    """Return the subclass of Snapshot with passed field names."""
+    return type('Snapshot', (Snapshot,), dict(__slots__=names, _fields=names))
+
+
+def _make_snapshot(names: Tuple[str, ...], values: Tuple[Any, ...]
+                   ) -> Snapshot:
+    """Return a snapshot of passed values, for unpickling."""
+    cls = _snapshot_class(names)
+    snapshot = object.__new__(cls)
+    for name, value in zip(names, values):
+        getattr(cls, name).__set__(snapshot, value)
+    return snapshot
+
+
+def _is_name(key: Hashable) -> bool:
+    """Return True if passed key is usable as the name of a parameter."""
+    return (isinstance(key, str) and key.isidentifier() and
+            not (iskeyword(key) or key.startswith('_') or
+                 hasattr(Snapshot, key)))
+
+
+# The schema of a worker process of validate_stores.
+_worker_schema: Optional[ParameterSet] = None
+
+
+def _initialize_worker(schema: ParameterSet) -> None:
+    global _worker_schema
+    _worker_schema = schema
+
+
+def _validate_chunk(stores: List[Mapping]
+                    ) -> List[Dict[Hashable, ParameterError]]:
+    assert _worker_schema is not None
+    return [_worker_schema.validate(kvs) for kvs in stores]
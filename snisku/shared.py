@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""Key-value storage of parameters, shared between processes.
+
+This module requires a Unix-like operating system, for ‘fcntl’.
+
+"""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+import fcntl
+import json
+import mmap
+import os
+import struct
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import Set
+from typing import Tuple
+
+# Local:
+from .kvs import BaseStore
+
+
+#############
+# INTERFACE #
+#############
+
+
+# The first bytes of a file in this format, including a version number.
+MAGIC = b'SNSHM\x00\x00\x01'
+
+
+class SharedStore(BaseStore, MutableMapping):
+    """A mutable mapping of strings to JSON-serializable values, in mmap.
+
+    The values are held in a file mapped into the memory of each process that
+    opens it.
+
+    Like a KeyValueStore, this works with BaseParameter.retrieve, store and
+    reset, and emits the same signals. Each process that opens the same file
+    sees the same contents. Changes made by other processes are found by
+    ‘refresh’, which signals each key they changed, with this store as
+    sender, as ‘load’ and ‘clear’ would. Observers are notified likewise, so
+    a parse cache stays valid.
+
+    Every read refreshes, at the cost of checking a counter in shared memory,
+    and of decoding the contents only when the counter has changed. To have
+    signals sent promptly, call ‘refresh’ periodically.
+
+    Reads take no lock. A writer takes an exclusive ‘flock’ on the file and
+    increments the counter to an odd number before it writes, and to an even
+    number after. A reader retries until it reads the same even number before
+    and after copying the contents. This is a sequence lock.
+
+    Each write rewrites the entire contents. Inside a batch, writes are held
+    and written together when the batch ends. The file grows as needed.
+
+    Keys must be strings. An instance must be used from one thread only.
+
+    """
+
+    def __init__(self, filepath, capacity: int = 2 ** 16) -> None:
+        """Initialize. Open named file, creating it as needed.
+
+        A new or empty file is given room for ‘capacity’ bytes of contents.
+        Any other file must already be a shared store.
+
+        """
+        self.filepath = os.fspath(filepath)
+        self._fd = os.open(self.filepath, os.O_RDWR | os.O_CREAT, 0o666)
+        self._pending: Dict[str, Any] = dict()
+        self._pending_clear = False
+        self._view: Dict[str, Any] = dict()
+        self._sequence = -1
+
+        with self._lock(fcntl.LOCK_EX):
+            size = os.fstat(self._fd).st_size
+            if size == 0:
+                os.ftruncate(self._fd, _HEAD_SIZE + capacity)
+                self._map = mmap.mmap(self._fd, 0)
+                self._write(dict(), 0)
+            elif size >= _HEAD_SIZE:
+                self._map = mmap.mmap(self._fd, 0)
+        if not hasattr(self, '_map') or self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError('Not a Snisku shared store, or an unknown '
+                             'version: ‘{}’.'.format(self.filepath))
+        self.refresh()
+
+    def __getitem__(self, key: str) -> Any:
+        self.refresh()
+        return self._view[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if not isinstance(key, str):
+            raise TypeError('Key ‘{!r}’ is not a string.'.format(key))
+        self.refresh()
+        self._view[key] = value
+        self._pending[key] = value
+        for observer in self._observers:
+            observer.changed(key)
+        if self._held is None:
+            self.flush()
+
+    def __delitem__(self, key: str) -> None:
+        self.refresh()
+        del self._view[key]
+        self._pending[key] = _ABSENT
+        for observer in self._observers:
+            observer.changed(key)
+        if self._held is None:
+            self.flush()
+
+    def __contains__(self, key: Any) -> bool:
+        self.refresh()
+        return key in self._view
+
+    def __iter__(self) -> Iterator[str]:
+        self.refresh()
+        return iter(self._view)
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._view)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Override parent method for speed."""
+        self.refresh()
+        return self._view.get(key, default)
+
+    def update(self, *args, **kwargs) -> None:
+        """Extend parent method to write once."""
+        with self.batch():
+            super().update(*args, **kwargs)
+
+    @contextmanager
+    def batch(self) -> Iterator['SharedStore']:
+        """Extend parent method to hold writes as well as signals.
+
+        Held writes are visible through this object only, until they are
+        written at the end of the outermost batch, before held signals are
+        sent.
+
+        """
+        outermost = self._held is None
+        with super().batch():
+            try:
+                yield self
+            finally:
+                if outermost:
+                    self.flush()
+
+    def refresh(self) -> Set[str]:
+        """Adopt changes made by other processes. Return the changed keys.
+
+        Notify observers and send signals for each changed key.
+
+        """
+        sequence = _SEQUENCE.unpack_from(self._map, len(MAGIC))[0]
+        if sequence == self._sequence:
+            return set()
+        contents, sequence = self._read()
+        return self._adopt(contents, sequence)
+
+    def flush(self) -> None:
+        """Write held writes, merging with changes by other processes."""
+        if not (self._pending or self._pending_clear):
+            return
+        with self._lock(fcntl.LOCK_EX):
+            sequence, length = _HEAD.unpack_from(self._map, len(MAGIC))
+            contents = dict() if self._pending_clear else \
+                json.loads(self._map[_HEAD_SIZE:_HEAD_SIZE + length])
+            for key, value in self._pending.items():
+                if value is _ABSENT:
+                    contents.pop(key, None)
+                else:
+                    contents[key] = value
+            self._pending.clear()
+            self._pending_clear = False
+            sequence = self._write(contents, sequence)
+        self._adopt(contents, sequence)
+
+    def close(self) -> None:
+        """Write held writes. Unmap and close the file."""
+        if self._fd < 0:
+            return
+        try:
+            if hasattr(self, '_map'):
+                self.flush()
+                self._map.close()
+        finally:
+            os.close(self._fd)
+            self._fd = -1
+
+    @contextmanager
+    def _lock(self, operation: int) -> Iterator[None]:
+        fcntl.flock(self._fd, operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _read(self) -> Tuple[Dict[str, Any], int]:
+        """Return contents and their sequence number, without a lock.
+
+        Fall back to a shared lock if writers keep interfering.
+
+        """
+        for _ in range(_RETRIES):
+            sequence, length = _HEAD.unpack_from(self._map, len(MAGIC))
+            if sequence % 2:
+                # A write is in progress.
+                os.sched_yield()
+                continue
+            if _HEAD_SIZE + length > len(self._map):
+                # The file has grown.
+                self._remap()
+                continue
+            data = self._map[_HEAD_SIZE:_HEAD_SIZE + length]
+            if _SEQUENCE.unpack_from(self._map, len(MAGIC))[0] == sequence:
+                return json.loads(data), sequence
+
+        with self._lock(fcntl.LOCK_SH):
+            self._remap()
+            sequence, length = _HEAD.unpack_from(self._map, len(MAGIC))
+            data = self._map[_HEAD_SIZE:_HEAD_SIZE + length]
+        return json.loads(data), sequence
+
+    def _write(self, contents: Dict[str, Any], sequence: int) -> int:
+        """Write passed contents under a lock. Return the new sequence number.
+
+        An odd number, left by a writer that failed, is treated as if the
+        write had begun.
+
+        """
+        data = json.dumps(contents).encode('utf-8')
+        self._remap()
+        if _HEAD_SIZE + len(data) > len(self._map):
+            size = len(self._map)
+            while _HEAD_SIZE + len(data) > size:
+                size *= 2
+            os.ftruncate(self._fd, size)
+            self._remap()
+
+        sequence |= 1
+        self._map[:len(MAGIC)] = MAGIC
+        _SEQUENCE.pack_into(self._map, len(MAGIC), sequence)
+        self._map[_HEAD_SIZE:_HEAD_SIZE + len(data)] = data
+        _LENGTH.pack_into(self._map, len(MAGIC) + _SEQUENCE.size, len(data))
+        _SEQUENCE.pack_into(self._map, len(MAGIC), sequence + 1)
+        return sequence + 1
+
+    def _remap(self) -> None:
+        """Map the whole file anew if it has grown."""
+        if os.fstat(self._fd).st_size != len(self._map):
+            self._map.close()
+            self._map = mmap.mmap(self._fd, 0)
+
+    def _adopt(self, contents: Dict[str, Any], sequence: int) -> Set[str]:
+        """Replace the view of the contents. Signal changed keys."""
+        if self._pending_clear:
+            contents = dict()
+        for key, value in self._pending.items():
+            if value is _ABSENT:
+                contents.pop(key, None)
+            else:
+                contents[key] = value
+        old, self._view = self._view, contents
+        self._sequence = sequence
+
+        changed = {k for k, v in contents.items()
+                   if old.get(k, _ABSENT) != v}
+        changed.update(k for k in old if k not in contents)
+        for key in changed:
+            for observer in self._observers:
+                observer.changed(key)
+        with BaseStore.batch(self):
+            for key in changed:
+                if key in contents:
+                    self._signal(key, merge=True, new_value=contents[key])
+                else:
+                    self._signal(key, reset=True)
+        return changed
+
+    def _clear(self) -> None:
+        self._view = dict()
+        self._pending.clear()
+        self._pending_clear = True
+        if self._held is None:
+            self.flush()
+
+    def _dumpable(self) -> Any:
+        self.refresh()
+        return dict(self._view)
+
+
+############
+# INTERNAL #
+############
+
+
+# The header, after the magic number: A sequence number and the length of
+# the contents, as JSON, which follow the header.
+_SEQUENCE = struct.Struct('<Q')
+_LENGTH = struct.Struct('<Q')
+_HEAD = struct.Struct('<QQ')
+_HEAD_SIZE = len(MAGIC) + _HEAD.size
+
+# Attempts at reading without a lock.
+_RETRIES = 100
+
+# A marker for a removed key.
+_ABSENT = object()
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""Key-value storage of parameters in an SQLite database.
+
+This is intended for stores too large to hold in memory, and to rewrite in
+full, as a KeyValueStore must be.
+
+"""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+from collections import OrderedDict
+from collections.abc import MutableMapping
+import json
+import os
+import sqlite3
+from typing import Any
+from typing import Dict
+from typing import Iterator
+
+# Local:
+from .kvs import BaseStore
+
+
+#############
+# INTERFACE #
+#############
+
+
+class SQLiteStore(BaseStore, MutableMapping):
+    """A mutable mapping of strings to JSON-serializable values, in SQLite.
+
+    Like a KeyValueStore, this works with BaseParameter.retrieve, store and
+    reset, and emits the same signals. Its ‘load’ and ‘dump’ methods read and
+    write the same JSON format as those of KeyValueStore, for import and
+    export, though ‘dump’ holds the whole store in memory while it runs.
+
+    Recently read values, and the absence of recently read keys, are held in
+    a bounded LRU cache of ‘cache_size’ entries. Values are decoded once, on
+    entering the cache. As with a dict, mutating a value in place does not
+    store it.
+
+    Values are encoded as JSON when written, so that a value that cannot be
+    encoded is rejected at once. Writes are buffered and committed together,
+    in a single transaction, when ‘batch_size’ writes are pending, when
+    ‘flush’ or ‘close’ is called, or before iteration. Pending writes are
+    visible to reads through this object only.
+
+    Keys must be strings. An instance must be used from one thread only.
+
+    """
+
+    def __init__(self, filepath=':memory:', table: str = 'snisku',
+                 cache_size: int = 2 ** 10, batch_size: int = 2 ** 10
+                 ) -> None:
+        """Initialize. Connect to named database file, creating as needed."""
+        assert table.isidentifier()
+        self.table = table
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self._connection = sqlite3.connect(
+            filepath if filepath == ':memory:' else os.fspath(filepath))
+        self._cache: OrderedDict = OrderedDict()
+        # Pending writes, as JSON text, or _ABSENT for removal.
+        self._pending: Dict[str, Any] = dict()
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS {} (key TEXT PRIMARY KEY, '
+                'value TEXT NOT NULL)'.format(table))
+
+    def __getitem__(self, key: str) -> Any:
+        cache = self._cache
+        try:
+            value = cache[key]
+        except KeyError:
+            text = self._pending.get(key, _MISSING)
+            if text is _MISSING:
+                value = self._select(key)
+            elif text is _ABSENT:
+                value = _ABSENT
+            else:
+                value = json.loads(text)
+            cache[key] = value
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        if value is _ABSENT:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if not isinstance(key, str):
+            raise TypeError('Key ‘{!r}’ is not a string.'.format(key))
+        self._write(key, json.dumps(value))
+        for observer in self._observers:
+            observer.changed(key)
+
+    def __delitem__(self, key: str) -> None:
+        self[key]  # Raise KeyError if absent.
+        self._write(key, _ABSENT)
+        for observer in self._observers:
+            observer.changed(key)
+
+    def __iter__(self) -> Iterator[str]:
+        self.flush()
+        cursor = self._connection.execute(
+            'SELECT key FROM {} ORDER BY rowid'.format(self.table))
+        for row in cursor:
+            yield row[0]
+
+    def __len__(self) -> int:
+        self.flush()
+        return self._connection.execute(
+            'SELECT COUNT(*) FROM {}'.format(self.table)).fetchone()[0]
+
+    def flush(self) -> None:
+        """Commit pending writes in one transaction."""
+        if not self._pending:
+            return
+        removals = [(k,) for k, v in self._pending.items() if v is _ABSENT]
+        writes = [(k, v) for k, v in self._pending.items()
+                  if v is not _ABSENT]
+        with self._connection:
+            self._connection.executemany(
+                'DELETE FROM {} WHERE key = ?'.format(self.table), removals)
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO {} (key, value) VALUES (?, ?)'
+                .format(self.table), writes)
+        self._pending.clear()
+
+    def close(self) -> None:
+        """Commit pending writes and close the database connection."""
+        self.flush()
+        self._connection.close()
+
+    def _select(self, key: str) -> Any:
+        row = self._connection.execute(
+            'SELECT value FROM {} WHERE key = ?'.format(self.table),
+            (key,)).fetchone()
+        if row is None:
+            return _ABSENT
+        return json.loads(row[0])
+
+    def _write(self, key: str, text: Any) -> None:
+        """Hold passed JSON text, or _ABSENT, as a pending write to key."""
+        self._pending[key] = text
+        if text is _ABSENT:
+            self._cache[key] = _ABSENT
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            # Decode on the next read, for a copy of the value as written.
+            self._cache.pop(key, None)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def _clear(self) -> None:
+        self._pending.clear()
+        self._cache.clear()
+        with self._connection:
+            self._connection.execute('DELETE FROM {}'.format(self.table))
+
+    def _dumpable(self) -> Any:
+        return dict(self.items())
+
+
+############
+# INTERNAL #
+############
+
+
+# Markers for a key without a value, and for a key not yet looked up.
+_ABSENT = object()
+_MISSING = object()
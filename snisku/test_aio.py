@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the aio module and asynchronous storage, using pytest."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard library:
+import asyncio
+import json
+import threading
+
+# Local:
+from .aio import Change
+from .aio import OVERFLOW
+from .kvs import KeyValueStore
+
+
+#########
+# TESTS #
+#########
+
+
+def test_aload_adump(tmpdir):
+    f = tmpdir.join('settings.json')
+
+    async def main():
+        await KeyValueStore(a=1, b=2).adump(f)
+        kvs = KeyValueStore(a=1)
+        new = await kvs.aload(f, chunk_size=1)
+        return kvs, new
+
+    kvs, new = asyncio.run(main())
+    assert json.loads(f.read()) == dict(a=1, b=2)
+    assert kvs == dict(a=1, b=2)
+    assert new == dict(b=2)
+
+
+def test_stream_merges_by_key():
+    async def main():
+        kvs = KeyValueStore()
+        async with kvs.achanges() as changes:
+            kvs.absorb(dict(a=1, b=2))
+            kvs.absorb(dict(a=3))
+            kvs.absorb(dict(a=3))  # Not new.
+            return [await changes.__anext__(), await changes.__anext__()]
+
+    assert asyncio.run(main()) == [
+        Change('b', dict(merge=True, new_value=2)),
+        Change('a', dict(merge=True, new_value=3))]
+
+
+def test_stream_overflow():
+    async def main():
+        kvs = KeyValueStore()
+        async with kvs.achanges(maxsize=2) as changes:
+            kvs.absorb(dict(a=1, b=2, c=3, d=4))
+        return [change.key async for change in changes]
+
+    assert asyncio.run(main()) == [OVERFLOW, 'd']
+
+
+def test_stream_backpressure(tmpdir):
+    f = tmpdir.join('settings.json')
+    contents = {str(i): i for i in range(50)}
+    f.write(json.dumps(contents))
+
+    async def main():
+        kvs = KeyValueStore()
+        received = dict()
+        async with kvs.achanges(maxsize=3) as changes:
+            loading = asyncio.ensure_future(kvs.aload(f, chunk_size=2))
+            async for change in changes:
+                received[change.key] = change.kwargs['new_value']
+                if len(received) == len(contents):
+                    break
+            await loading
+        return received
+
+    assert asyncio.run(main()) == contents
+
+
+def test_stream_backpressure_slow_consumer(tmpdir):
+    f = tmpdir.join('settings.json')
+    contents = {str(i): i for i in range(100)}
+    f.write(json.dumps(contents))
+
+    async def main():
+        kvs = KeyValueStore()
+        keys = list()
+        async with kvs.achanges(maxsize=10) as changes:
+            loading = asyncio.ensure_future(kvs.aload(f, chunk_size=10))
+            async for change in changes:
+                keys.append(change.key)
+                if change.key is OVERFLOW or len(keys) == len(contents):
+                    break
+                await asyncio.sleep(0.001)
+        await loading
+        return keys
+
+    assert asyncio.run(main()) == list(contents)
+
+
+def test_stream_from_thread():
+    async def main():
+        kvs = KeyValueStore()
+        async with kvs.achanges() as changes:
+            thread = threading.Thread(target=kvs.absorb, args=(dict(a=1),))
+            thread.start()
+            change = await changes.__anext__()
+            thread.join()
+        return change
+
+    assert asyncio.run(main()) == Change('a', dict(merge=True, new_value=1))
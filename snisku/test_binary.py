@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the binary module, using pytest."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard library:
+import io
+import json
+
+# Third party:
+import arrow
+import pytest
+
+# Local:
+from . import binary
+from .kvs import KeyValueStore
+from .types import ArrowParameter
+
+
+#########
+# TESTS #
+#########
+
+
+def round_trip(obj):
+    f = io.BytesIO()
+    binary.dump(obj, f)
+    f.seek(0)
+    return binary.load(f)
+
+
+def test_primitives():
+    obj = {'a': None, 'b': [True, False], 'c': -1, 'd': 2 ** 70, 'e': 0.5,
+           'f': 'å', 1: [{'a': 'a'}]}
+    assert round_trip(obj) == obj
+
+
+def test_columns():
+    obj = {'n': None, 'b': True, 'i': -1, 'j': 2 ** 40, 'd': 0.5,
+           's': 'å', '': '', 'z': '\x00', 'big': 2 ** 70,
+           'l': [{'a': (1,)}], 'm': {1: 'a'}, 'f': False}
+    loaded = round_trip(obj)
+    assert loaded == dict(obj, l=[{'a': [1]}])
+    assert list(loaded) == list(obj)
+
+
+def test_columns_empty():
+    assert round_trip({}) == {}
+    assert round_trip({'': None}) == {'': None}
+
+
+def test_columns_smaller_than_json():
+    obj = {'key_{}'.format(i): i / 7 if i % 2 else i for i in range(100)}
+    f = io.BytesIO()
+    binary.dump(obj, f)
+    assert len(f.getvalue()) < len(json.dumps(obj))
+
+
+def test_separator_in_key():
+    assert round_trip({'a\x00b': 1}) == {'a\x00b': 1}
+
+
+def test_tuple_as_list():
+    assert round_trip({'a': (1, 2)}) == {'a': [1, 2]}
+
+
+def test_interned_keys():
+    f = io.BytesIO()
+    binary.dump([{'long_key_name': i} for i in range(10)], f)
+    assert f.getvalue().count(b'long_key_name') == 1
+
+
+def test_unserializable():
+    with pytest.raises(TypeError):
+        round_trip({'a': object()})
+
+
+def test_bad_data():
+    with pytest.raises(ValueError):
+        binary.load(io.BytesIO(b'{}'))
+
+
+def test_store_cycle(tmpdir):
+    f = tmpdir.join('settings.bin')
+    parameter = ArrowParameter(key='t')
+    kvs = KeyValueStore(a=1)
+    parameter.store(kvs, arrow.get('2020-02-02T02:02:02+00:00'))
+    kvs.dump(f, handler=binary.dump, mode='wb', atomic=True)
+
+    loaded = KeyValueStore()
+    loaded.load(f, handler=binary.load, mode='rb')
+    assert loaded == kvs
+    assert parameter.retrieve(loaded) == parameter.retrieve(kvs)
+
+
+def test_truncated_data():
+    f = io.BytesIO()
+    binary.dump({'a': 'b', 'c': 1, 'd': [2]}, f)
+    data = f.getvalue()
+    for end in range(len(binary.MAGIC), len(data)):
+        with pytest.raises(ValueError):
+            binary.load(io.BytesIO(data[:end]))
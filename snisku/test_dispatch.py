@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the dispatch module, using pytest."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard library:
+import gc
+
+# Third party:
+import pytest
+
+# Local:
+from . import dispatch
+from .dispatch import ANY
+from .dispatch import FastDispatcher
+from .kvs import CHANGED
+from .kvs import KeyValueStore
+from .param import BaseParameter
+
+
+############
+# FIXTURES #
+############
+
+
+@pytest.fixture
+def fast():
+    prior = dispatch.get_dispatcher()
+    dispatcher = FastDispatcher()
+    dispatch.set_dispatcher(dispatcher)
+    yield dispatcher
+    dispatch.set_dispatcher(prior)
+
+
+#########
+# TESTS #
+#########
+
+
+def test_send_without_receivers(fast):
+    assert fast.send('a', object(), new_value=1) == []
+
+
+def test_send_selective_arguments(fast):
+    sender = KeyValueStore()
+    received = []
+
+    def on_new_value(new_value=None):
+        received.append(new_value)
+
+    def on_anything(**kwargs):
+        received.append(kwargs)
+
+    fast.connect(on_new_value, signal='a', sender=sender)
+    fast.connect(on_anything, signal=ANY, sender=ANY)
+    responses = fast.send('a', sender, new_value=1)
+    assert [r[0] for r in responses] == [on_new_value, on_anything]
+    assert received == [1, dict(signal='a', sender=sender, new_value=1)]
+
+    del received[:]
+    fast.send('b', sender, new_value=2)
+    assert received == [dict(signal='b', sender=sender, new_value=2)]
+
+
+def test_disconnect(fast):
+    received = []
+
+    def on_a(new_value=None):
+        received.append(new_value)
+
+    fast.connect(on_a, signal='a')
+    fast.connect(on_a, signal='a')
+    fast.send('a', None, new_value=1)
+    fast.disconnect(on_a, signal='a')
+    fast.send('a', None, new_value=2)
+    assert received == [1]
+
+
+def test_weak_receiver(fast):
+    received = []
+
+    def on_a(new_value=None):
+        received.append(new_value)
+
+    fast.connect(on_a, signal='a')
+    del on_a
+    gc.collect()
+    assert fast.send('a', None, new_value=1) == []
+    assert not received
+
+
+def test_dead_sender(fast):
+    sender = KeyValueStore()
+    fast.connect(lambda: None, signal='a', sender=sender, weak=False)
+    assert fast._connections
+    del sender
+    gc.collect()
+    assert not fast._connections
+
+
+def test_store_and_batch(fast):
+    kvs = KeyValueStore()
+    parameter = BaseParameter(key='a')
+    received = []
+
+    def on_a(new_value=None):
+        received.append(new_value)
+
+    def on_changed(keys=None):
+        received.append(keys)
+
+    dispatch.connect(on_a, signal='a', sender=kvs)
+    dispatch.connect(on_changed, signal=CHANGED, sender=kvs)
+    parameter.store(kvs, 1)
+    with kvs.batch():
+        parameter.store(kvs, 2)
+        parameter.store(kvs, 3)
+    assert received == [1, 3, {'a'}]
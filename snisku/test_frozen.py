@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the frozen module, using pytest."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard library:
+import random
+
+# Third party:
+import pytest
+
+# Local:
+from .frozen import FrozenKeyValueStore
+from .kvs import KeyValueStore
+from .types import AnyIntegerParameter
+
+
+#############
+# CONSTANTS #
+#############
+
+
+class Colliding(object):
+    """A key with a poor hash."""
+
+    def __init__(self, name, hash):
+        self.name = name
+        self.hash = hash
+
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, other):
+        return isinstance(other, Colliding) and self.name == other.name
+
+
+#########
+# TESTS #
+#########
+
+
+def test_versions():
+    v0 = FrozenKeyValueStore(KeyValueStore(a='1'))
+    v1 = v0.set('b', '2')
+    v2 = v1.delete('a')
+    assert v0 == dict(a='1')
+    assert v1 == dict(a='1', b='2')
+    assert v2 == dict(b='2')
+    assert len(v2) == 1
+    assert v2.set('b', '2') is v2
+    with pytest.raises(KeyError):
+        v2.delete('a')
+    assert v2.thaw() == dict(b='2')
+    assert type(v2.thaw()) is KeyValueStore
+
+
+def test_retrieve():
+    parameter = AnyIntegerParameter(key='a', default=0)
+    store = FrozenKeyValueStore()
+    assert parameter.retrieve(store) == 0
+    assert parameter.retrieve(store.set('a', '1')) == 1
+
+
+def test_against_dict():
+    rng = random.Random(0)
+    reference = dict()
+    store = FrozenKeyValueStore()
+    keys = [str(i) for i in range(300)] + list(range(100))
+    keys += [Colliding(str(i), i % 3) for i in range(20)]
+    for _ in range(3000):
+        key = rng.choice(keys)
+        if key in reference and rng.random() < 0.4:
+            del reference[key]
+            store = store.delete(key)
+        else:
+            value = rng.random()
+            reference[key] = value
+            store = store.set(key, value)
+        assert len(store) == len(reference)
+    assert dict(store) == reference
+    for key in keys:
+        assert store.get(key, None) == reference.get(key)
+
+
+def test_structural_sharing():
+    v0 = FrozenKeyValueStore((str(i), i) for i in range(1000))
+    v1 = v0.set('0', -1)
+    shared = set(map(id, v0._root.entries)) & set(map(id, v1._root.entries))
+    assert len(shared) == len(v0._root.entries) - 1
+
+
+def test_diff():
+    v0 = FrozenKeyValueStore((str(i), i) for i in range(1000))
+    v1 = v0.set('0', -1).delete('1').set('a', 0).set('2', 2)
+    patch = v0.diff(v1)
+    assert sorted(patch['set']) == [['0', -1], ['a', 0]]
+    assert patch['unset'] == ['1']
+    general = v0.diff(dict(v1))
+    assert sorted(general['set']) == sorted(patch['set'])
+    assert general['unset'] == patch['unset']
+
+    kvs = v0.thaw()
+    kvs.apply(patch)
+    assert kvs == v1
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the instrument module, using pytest."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Third party:
+import pytest
+
+# Local:
+from . import instrument
+from .exc import ParserError
+from .exc import ValidationFailure
+from .kvs import KeyValueStore
+from .param import BaseParameter
+
+
+#############
+# FIXTURES #
+#############
+
+
+@pytest.fixture
+def enabled():
+    instrument.reset()
+    instrument.enable()
+    yield
+    instrument.disable()
+    instrument.reset()
+
+
+#########
+# TESTS #
+#########
+
+
+def test_disabled_is_original():
+    original = BaseParameter.store
+    instrument.enable()
+    assert BaseParameter.store is not original
+    assert instrument.is_enabled()
+    instrument.disable()
+    assert BaseParameter.store is original
+    assert not instrument.is_enabled()
+
+
+def test_counts_and_failures(enabled):
+    p = BaseParameter(key='p', parser=int, validator=lambda v: v > 0)
+    kvs = KeyValueStore()
+    p.store(kvs, '1')
+    assert p.retrieve(kvs) == 1
+    p.store(kvs, 'x')
+    with pytest.raises(ParserError):
+        p.retrieve(kvs)
+    p.store(kvs, '-1')
+    with pytest.raises(ValidationFailure):
+        p.retrieve(kvs)
+    p.reset(kvs)
+    p.reset(kvs)  # No change, no signal.
+
+    statistics = instrument.as_dict()['p']
+    assert statistics['store']['count'] == 3
+    assert statistics['signal']['count'] == 4
+    assert statistics['reset']['count'] == 2
+    parsing = statistics['parse_and_validate']
+    assert parsing['count'] == 3
+    assert parsing['failures'] == dict(ParserError=1, ValidationFailure=1)
+    assert 0 < parsing['seconds_max'] <= parsing['seconds_total']
+
+
+def test_non_raising_failures(enabled):
+    p = BaseParameter(key='p', parser=int)
+    assert not p.try_parse_and_validate('x')
+    statistics = instrument.as_dict()['p']
+    assert statistics['try_parse_and_validate']['failures'] == \
+        dict(ParserError=1)
+    assert 'parse_and_validate' not in statistics
+
+
+def test_prometheus(enabled):
+    p = BaseParameter(key='a"b', parser=int)
+    with pytest.raises(ParserError):
+        p.parse_and_validate('x')
+    text = instrument.prometheus()
+    assert '# TYPE snisku_parameter_calls_total counter\n' in text
+    assert ('snisku_parameter_failures_total{key="a\\"b",'
+            'operation="parse_and_validate",exception="ParserError"} 1\n'
+            in text)
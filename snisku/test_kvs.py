@@ -6,8 +6,22 @@
 ###########
 
 
+# Standard library:
+import copy
+import json
+import pickle
+
+# Third party:
+from pydispatch import dispatcher
+import pytest
+
 # Local:
+from .exc import InvalidContents
+from .kvs import CHANGED
 from .kvs import KeyValueStore
+from .param import BaseParameter
+from .schema import ParameterSet
+from .types import NonnegativeIntegerParameter
 
 
 #########
@@ -37,3 +51,229 @@ def test_load_trivial_json_object(tmpdir):
     f = tmpdir.join('settings.json')
     f.write('{"a": 1}')
     assert KeyValueStore().load(f) == dict(a=1)
+
+
+def test_load_with_schema(tmpdir):
+    f = tmpdir.join('settings.json')
+    f.write('{"a": "1", "b": 2, "c": "x"}')
+    schema = ParameterSet(BaseParameter(key='a', parser=int),
+                          NonnegativeIntegerParameter(key='b'))
+    kvs = KeyValueStore()
+    cache = kvs.enable_cache()
+    assert kvs.load(f, schema=schema) == dict(a='1', b=2, c='x')
+    assert len(cache) == 2
+    assert schema['a'].retrieve(kvs) == 1
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_load_with_schema_invalid(tmpdir):
+    f = tmpdir.join('settings.json')
+    f.write('{"a": -1, "b": -2, "c": 3}')
+    schema = ParameterSet(NonnegativeIntegerParameter(key='a'),
+                          NonnegativeIntegerParameter(key='b'),
+                          NonnegativeIntegerParameter(key='c'))
+    kvs = KeyValueStore()
+    with pytest.raises(InvalidContents) as info:
+        kvs.load(f, schema=schema)
+    assert sorted(info.value.errors) == ['a', 'b']
+    assert kvs == dict()
+
+
+def test_parse_cache_hits_and_misses():
+    kvs = KeyValueStore(a='1')
+    cache = kvs.enable_cache()
+    parameter = BaseParameter(key='a', parser=int)
+
+    assert parameter.retrieve(kvs) == 1
+    assert parameter.retrieve(kvs) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_parse_cache_invalidation():
+    kvs = KeyValueStore(a='1')
+    cache = kvs.enable_cache()
+    parameter = BaseParameter(key='a', parser=int)
+
+    assert parameter.retrieve(kvs) == 1
+    kvs['a'] = '2'
+    assert parameter.retrieve(kvs) == 2
+    kvs.update(a='3')
+    assert parameter.retrieve(kvs) == 3
+    parameter.reset(kvs)
+    assert len(cache) == 0
+    kvs.setdefault('a', '4')
+    assert parameter.retrieve(kvs) == 4
+    kvs.clear()
+    assert len(cache) == 0
+    assert cache.misses == 4
+
+
+def test_parse_cache_bypass():
+    kvs = KeyValueStore(a='1')
+    cache = kvs.enable_cache()
+    parameter = BaseParameter(key='a', parser=int)
+
+    assert parameter.retrieve(kvs, parser=float) == 1.0
+    assert len(cache) == 0
+
+
+def test_batch_merges_signals():
+    kvs = KeyValueStore()
+    parameter = BaseParameter(key='a')
+    received = []
+
+    def on_a(new_value=None, reset=False):
+        received.append((new_value, reset))
+
+    def on_changed(keys=None):
+        received.append(keys)
+
+    dispatcher.connect(on_a, signal='a', sender=kvs)
+    dispatcher.connect(on_changed, signal=CHANGED, sender=kvs)
+
+    parameter.store(kvs, 1)
+    assert received == [(1, False)]
+    del received[:]
+
+    with kvs.batch():
+        parameter.store(kvs, 2)
+        parameter.store(kvs, 3)
+        kvs.clear()
+        assert not received
+        parameter.store(kvs, 4)
+    assert received == [(4, False), {'a'}]
+
+
+def test_load_signals_once_per_key(tmpdir):
+    f = tmpdir.join('settings.json')
+    f.write('{"a": 1, "b": 2}')
+    kvs = KeyValueStore(b=2)
+    received = []
+
+    def on_changed(keys=None):
+        received.append(keys)
+
+    dispatcher.connect(on_changed, signal=CHANGED, sender=kvs)
+    assert kvs.load(f) == dict(a=1)
+    assert received == [{'a'}]
+
+
+def test_fork_reads_writes_and_resets():
+    parent = KeyValueStore(a=1, b=2)
+    child = parent.fork()
+    parameter = BaseParameter(key='b', default=0)
+
+    assert child == dict(a=1, b=2)
+    child['a'] = 3
+    parameter.reset(child)
+    assert parameter.retrieve(child) == 0
+    child['c'] = 4
+    assert child == dict(a=3, c=4)
+    assert parent == dict(a=1, b=2)
+
+    grandchild = child.fork()
+    grandchild['b'] = 5
+    assert grandchild.flatten() == dict(a=3, b=5, c=4)
+
+    parent['d'] = 6
+    assert child == dict(a=3, c=4, d=6)
+
+    child.clear()
+    assert not child
+    assert parent == dict(a=1, b=2, d=6)
+    assert 'a' not in child
+
+
+def test_fork_signals_per_layer(tmpdir):
+    parent = KeyValueStore(a=1)
+    child = parent.fork()
+    parameter = BaseParameter(key='a')
+    received = []
+
+    def on_parent(new_value=None):
+        received.append(('parent', new_value))
+
+    def on_child(new_value=None):
+        received.append(('child', new_value))
+
+    dispatcher.connect(on_parent, signal='a', sender=parent)
+    dispatcher.connect(on_child, signal='a', sender=child)
+    parameter.store(child, 2)
+    parameter.store(parent, 3)
+    assert received == [('child', 2), ('parent', 3)]
+
+    f = tmpdir.join('settings.json')
+    child.dump(f)
+    assert f.read() == '{"a": 2}'
+
+
+def test_diff_and_apply(tmpdir):
+    a = KeyValueStore(a=1, b=2, c=3)
+    b = KeyValueStore(a=1, b=4, d=5)
+    patch = a.diff(b)
+    assert patch == dict(set=[['b', 4], ['d', 5]], unset=['c'])
+
+    f = tmpdir.join('patch.json')
+    f.write(json.dumps(patch))
+    received = []
+
+    def on_changed(keys=None):
+        received.append(keys)
+
+    dispatcher.connect(on_changed, signal=CHANGED, sender=a)
+    a.apply(json.loads(f.read()))
+    assert a == b
+    assert received == [{'b', 'c', 'd'}]
+
+
+def test_diff_fork():
+    parent = KeyValueStore(a=1, b=2)
+    child = parent.fork()
+    child['a'] = 3
+    del child['b']
+    child['c'] = 4
+    patch = parent.diff(child)
+    assert patch == dict(set=[['a', 3], ['c', 4]], unset=['b'])
+    parent.apply(patch)
+    assert parent == child
+
+    child.clear()
+    child['d'] = 5
+    parent.apply(child.changes())
+    assert parent == child
+
+
+def test_tracker():
+    a = KeyValueStore(a=1, b=2)
+    b = KeyValueStore(a)
+    tracker = a.track()
+    a['a'] = 3
+    del a['b']
+    patch = tracker.patch()
+    assert patch == dict(set=[['a', 3]], unset=['b'])
+    b.apply(patch)
+    assert a == b
+
+    a.clear()
+    a['c'] = 4
+    b.apply(tracker.patch())
+    assert a == b
+    tracker.close()
+    a['d'] = 5
+    assert tracker.patch() == dict(set=[], unset=[])
+
+
+def test_copy_and_pickle_without_hooks(tmpdir):
+    kvs = KeyValueStore(a=1)
+    kvs.enable_cache()
+    tracker = kvs.track()
+    saver = kvs.autosave(tmpdir.join('settings.json'))
+    try:
+        for other in (copy.copy(kvs), pickle.loads(pickle.dumps(kvs))):
+            assert type(other) is KeyValueStore
+            assert other == dict(a=1)
+            assert other.parse_cache is None
+            other['b'] = 2
+            assert tracker.patch() == dict(set=[], unset=[])
+    finally:
+        saver.close()
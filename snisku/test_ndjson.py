@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the ndjson module, using pytest."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Third party:
+import pytest
+
+# Local:
+from . import ndjson
+from .kvs import KeyValueStore
+
+
+#########
+# TESTS #
+#########
+
+
+def test_dump_in_chunks(tmpdir):
+    f = tmpdir.join('settings.ndjson')
+    kvs = KeyValueStore({'a': 1, 'b': [2], 3: None})
+    kvs.dump(f, handler=lambda o, fo: ndjson.dump(o, fo, chunk_size=2))
+    assert f.read() == '["a", 1]\n["b", [2]]\n[3, null]\n'
+
+
+def test_round_trip(tmpdir):
+    f = tmpdir.join('settings.ndjson')
+    KeyValueStore({'a': 1, 'b': [2], 3: None}).dump(f, handler=ndjson.dump)
+    kvs = KeyValueStore(a=1)
+    assert kvs.load(f, handler=ndjson.load) == {'b': [2], 3: None}
+    assert kvs == {'a': 1, 'b': [2], 3: None}
+
+
+def test_load_without_merge(tmpdir):
+    f = tmpdir.join('settings.ndjson')
+    f.write('["a", 1]\n\n["b", 2]\n')
+    kvs = KeyValueStore(a=1)
+    assert kvs.load(f, handler=ndjson.load, merge=False) == dict(b=2)
+    assert kvs == dict(a=1)
+
+
+def test_bad_record(tmpdir):
+    f = tmpdir.join('settings.ndjson')
+    f.write('["a", 1]\n["b"]\n')
+    with pytest.raises(ValueError, match='line 2'):
+        KeyValueStore().load(f, handler=ndjson.load)
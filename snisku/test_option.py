@@ -6,6 +6,12 @@
 ###########
 
 
+# Standard library:
+import copy
+from dataclasses import dataclass
+import pickle
+from typing import Any
+
 # Third party:
 import pytest
 
@@ -26,6 +32,11 @@ o0 = Option('a', None)
 o1 = Option('b', None)
 
 
+@dataclass(frozen=True)
+class HeavyOption(Option):
+    extra: Any = None
+
+
 #########
 # TESTS #
 #########
@@ -62,3 +73,57 @@ def test_two_strings_exhaustive():
     param.store(kvs, 'c')
     with pytest.raises(ValidationFailure):
         param.retrieve(kvs)
+
+
+def test_option_for():
+    unhashable = Option(['x'], None)
+    param = OptionParameter(key='p', options=(o0, o1, unhashable))
+    assert param.option_for('b') is o1
+    assert param.option_for(['x']) is unhashable
+    with pytest.raises(KeyError):
+        param.option_for('c')
+    with pytest.raises(KeyError):
+        param.option_for(['y'])
+
+
+def test_reassigned_options_exhaustive():
+    param = ExhaustiveParameter(key='p', options=(o0,), default=o0.value)
+
+    kvs = KeyValueStore()
+    param.store(kvs, 'b')
+    with pytest.raises(ValidationFailure):
+        param.retrieve(kvs)
+
+    param.options = (o0, o1)
+    assert param.retrieve(kvs) == 'b'
+
+
+def test_exhaustive_pickle():
+    param = pickle.loads(pickle.dumps(
+        ExhaustiveParameter(key='e', options=(Option(1, None),))))
+    assert param.parse_and_validate(1) == 1
+    with pytest.raises(ValidationFailure):
+        param.parse_and_validate(2)
+
+
+def test_subclass_pickle_and_copy():
+    option = HeavyOption('a', None, extra='heavy')
+    assert pickle.loads(pickle.dumps(option)).extra == 'heavy'
+    assert copy.copy(option).extra == 'heavy'
+    assert copy.copy(option) == option
+
+
+def test_options_in_list_mutated():
+    options = [o0]
+    param = ExhaustiveParameter(key='p', options=options)
+    with pytest.raises(ValidationFailure):
+        param.parse_and_validate('b')
+    options.append(o1)
+    assert param.parse_and_validate('b') == 'b'
+    assert param.option_for('b') is o1
+
+
+def test_slots():
+    assert not hasattr(o0, '__dict__')
+    assert not hasattr(ExhaustiveParameter(key='e', options=(o0,)),
+                       '__dict__')
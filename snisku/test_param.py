@@ -10,6 +10,7 @@
 import pytest
 
 # Local:
+from .kvs import KeyValueStore
 from .param import BaseParameter as Parameter
 from .exc import ParserError
 from .exc import ValidatorError
@@ -61,3 +62,78 @@ def test_integer_validator_error():
     kvs = dict(a=1)
     with pytest.raises(ValidatorError):
         p.retrieve(kvs)
+
+
+def test_try_parse_and_validate():
+    p = Parameter(key='a', parser=int, validator=lambda v: v > 0)
+    result = p.try_parse_and_validate('1')
+    assert result
+    assert (result.value, result.error, result.message) == (1, None, '')
+
+    result = p.try_parse_and_validate('x')
+    assert not result
+    assert result.error is ParserError
+    assert isinstance(result.cause, ValueError)
+    assert result.message == 'Could not parse ‘\'x\'’ as a value for ‘a’.'
+    with pytest.raises(ParserError) as info:
+        result.unwrap()
+    assert info.value.__cause__ is result.cause
+
+    result = p.try_parse_and_validate(-1)
+    assert (result.error, result.cause) == (ValidationFailure, None)
+
+
+def test_raising_matches_non_raising():
+    p = Parameter(key='a', parser=int, validator=lambda v: 1 / v)
+    for value in ('x', 0, '2'):
+        result = p.try_parse_and_validate(value)
+        try:
+            assert p.parse_and_validate(value) == result.value
+        except (ParserError, ValidatorError) as e:
+            assert type(e) is result.error
+            assert str(e) == result.message
+            assert type(e.__cause__) is type(result.cause)
+
+
+def test_parser_called_once_on_failure():
+    calls = list()
+
+    def parser(value):
+        calls.append(value)
+        return int(value)
+
+    with pytest.raises(ParserError):
+        Parameter(key='a', parser=parser).parse_and_validate('x')
+    assert calls == ['x']
+
+
+def test_try_retrieve_cached():
+    p = Parameter(key='a', parser=int)
+    kvs = KeyValueStore(a='x')
+    cache = kvs.enable_cache()
+    assert p.try_retrieve(kvs).error is ParserError
+    kvs['a'] = '3'
+    assert p.try_retrieve(kvs).value == 3
+    assert p.try_retrieve(kvs).value == 3
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_parse_and_validate_many_fallback():
+    p = Parameter(key='p', parser=lambda v: int(v), validator=lambda v: v > 0)
+    values, failures = p.parse_and_validate_many(['1', 'x', '-1', 2])
+    assert values == [1, None, None, 2]
+    assert failures == {1: ParserError, 2: ValidationFailure}
+
+
+def test_parse_and_validate_many_vectorized():
+    numpy = pytest.importorskip('numpy')
+    p = Parameter(key='p', parser=int, validator=lambda v: v % 2 == 0)
+    values, failures = p.parse_and_validate_many(numpy.array([2, 3, 4]))
+    assert isinstance(values, numpy.ndarray)
+    assert values.tolist() == [2, 3, 4]
+    assert failures == {1: ValidationFailure}
+
+    # Floats are not truncated in bulk.
+    values, failures = p.parse_and_validate_many([2.5, 4.0])
+    assert values == [2, 4]
+    assert failures == {}
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the persist module, using pytest."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard library:
+import json
+import os
+import stat
+import threading
+import time
+
+# Third party:
+from pydispatch import dispatcher
+import pytest
+
+# Local:
+from . import persist
+from .kvs import CHANGED
+from .kvs import KeyValueStore
+from .param import BaseParameter
+from .persist import Journal
+from .persist import write_atomically
+
+
+#########
+# TESTS #
+#########
+
+
+def test_write_atomically(tmpdir):
+    f = tmpdir.join('settings.json')
+    f.write('{"a": 1}')
+    write_atomically(f, lambda fo: fo.write('{"a": 2}'))
+    assert f.read() == '{"a": 2}'
+    assert tmpdir.listdir() == [f]
+
+
+def test_write_atomically_failure(tmpdir):
+    f = tmpdir.join('settings.json')
+    f.write('{"a": 1}')
+
+    def write(fo):
+        fo.write('{"a": ')
+        raise RuntimeError()
+
+    with pytest.raises(RuntimeError):
+        write_atomically(f, write)
+    assert f.read() == '{"a": 1}'
+    assert tmpdir.listdir() == [f]
+
+
+def test_write_atomically_permissions(tmpdir):
+    new, old = tmpdir.join('new.json'), tmpdir.join('old.json')
+    old.write('')
+    old.chmod(0o640)
+    umask = os.umask(0o027)
+    try:
+        write_atomically(new, lambda fo: fo.write('{}'))
+        write_atomically(old, lambda fo: fo.write('{}'))
+    finally:
+        os.umask(umask)
+    assert stat.S_IMODE(new.stat().mode) == 0o640
+    assert stat.S_IMODE(old.stat().mode) == 0o640
+
+
+def test_autosave_flush(tmpdir):
+    f = tmpdir.join('settings.json')
+    calls = []
+
+    def handler(obj, fo):
+        calls.append(obj)
+        json.dump(obj, fo)
+
+    kvs = KeyValueStore()
+    parameter = BaseParameter(key='a')
+    saver = kvs.autosave(f, interval=60, handler=handler)
+    try:
+        for i in range(100):
+            parameter.store(kvs, i, signal=False)
+        saver.flush()
+        saver.flush()
+        assert calls == [dict(a=99)]
+        assert f.read() == '{"a": 99}'
+    finally:
+        saver.close()
+    parameter.store(kvs, 100)
+    assert len(calls) == 1
+
+
+def test_autosave_background(tmpdir):
+    f = tmpdir.join('settings.json')
+    kvs = KeyValueStore()
+    saver = kvs.autosave(f, interval=0.01)
+    try:
+        kvs['a'] = 1
+        for _ in range(500):
+            if f.exists():
+                break
+            time.sleep(0.01)
+        assert f.read() == '{"a": 1}'
+    finally:
+        saver.close()
+
+
+def test_journal_replay(tmpdir):
+    f = tmpdir.join('settings.json')
+    kvs = KeyValueStore(a=1)
+    journal = kvs.journal(f)
+    assert json.loads(f.read()) == dict(a=1)
+
+    kvs['b'] = 2
+    kvs['a'] = 3
+    del kvs['b']
+    kvs['c'] = [4]
+    assert f.read() == '{"a": 1}'
+    assert Journal.replay(f) == dict(a=3, c=[4])
+    journal.close()
+
+    # Simulate a crash during writing.
+    log = tmpdir.join('settings.json.log')
+    log.write('["c", ', mode='a')
+    assert Journal.replay(f) == dict(a=3, c=[4])
+
+    kvs = KeyValueStore()
+    journal = kvs.journal(f)
+    assert kvs == dict(a=3, c=[4])
+    kvs.clear()
+    kvs['d'] = 5
+    assert Journal.replay(f) == dict(d=5)
+    journal.close()
+
+
+def test_journal_compaction(tmpdir):
+    f = tmpdir.join('settings.json')
+    kvs = KeyValueStore()
+    journal = kvs.journal(f, threshold=100)
+    for i in range(100):
+        kvs['a'] = i
+    journal.compact()
+    assert json.loads(f.read()) == dict(a=99)
+    assert tmpdir.join('settings.json.log').read() == ''
+    assert not tmpdir.join('settings.json.log.old').exists()
+    kvs['b'] = 1
+    journal.close()
+    assert Journal.replay(f) == dict(a=99, b=1)
+
+
+def test_journal_failed_compaction(tmpdir, monkeypatch):
+    f = tmpdir.join('settings.json')
+    kvs = KeyValueStore()
+    journal = kvs.journal(f, threshold=50)
+
+    def fail(*args, **kwargs):
+        raise OSError('Disk full.')
+
+    monkeypatch.setattr(persist, 'write_atomically', fail)
+    for i in range(8):
+        kvs['k{}'.format(i)] = i
+    journal._wait()
+    assert isinstance(journal.error, OSError)
+    for i in range(8, 16):
+        kvs['k{}'.format(i)] = i
+    journal._wait()
+    assert Journal.replay(f) == {'k{}'.format(i): i for i in range(16)}
+
+    monkeypatch.undo()
+    journal.compact()
+    assert journal.error is None
+    assert not tmpdir.join('settings.json.log.old').exists()
+    journal.close()
+    assert Journal.replay(f) == {'k{}'.format(i): i for i in range(16)}
+
+
+def test_journal_compaction_during_compact(tmpdir, monkeypatch):
+    f = tmpdir.join('settings.json')
+    kvs = KeyValueStore()
+    journal = kvs.journal(f, threshold=50)
+    started, overtaken = threading.Event(), threading.Event()
+    write = persist.write_atomically
+
+    def slow(*args, **kwargs):
+        if started.is_set():
+            overtaken.set()
+        else:
+            started.set()
+            overtaken.wait(0.5)  # For a background checkpoint to overtake.
+        write(*args, **kwargs)
+
+    monkeypatch.setattr(persist, 'write_atomically', slow)
+    compaction = threading.Thread(target=journal.compact)
+    compaction.start()
+    started.wait()
+    for i in range(16):
+        kvs['k{}'.format(i)] = i
+    compaction.join()
+    journal._wait()
+    journal.close()
+    assert Journal.replay(f) == {'k{}'.format(i): i for i in range(16)}
+
+
+def test_journal_signals(tmpdir):
+    f = tmpdir.join('settings.json')
+    f.write('{"a": 1}')
+    kvs = KeyValueStore(a=1)
+    received = []
+
+    def on_changed(keys=None):
+        received.append(keys)
+
+    dispatcher.connect(on_changed, signal=CHANGED, sender=kvs)
+    tmpdir.join('settings.json.log').write('["b", 2]\n')
+    kvs.journal(f).close()
+    assert kvs == dict(a=1, b=2)
+    assert received == [{'b'}]
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the schema module, using pytest."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard library:
+import copy
+import pickle
+
+# Third party:
+import pytest
+
+# Local:
+from .exc import InvalidContents
+from .exc import ParserError
+from .exc import ValidationFailure
+from .kvs import KeyValueStore
+from .param import BaseParameter
+from .schema import ParameterSet
+from .schema import REGISTRY
+from .schema import Registry
+from .schema import validate_stores
+from .types import AnyIntegerParameter
+from .types import NonnegativeIntegerParameter
+
+
+#############
+# CONSTANTS #
+#############
+
+
+a = AnyIntegerParameter(key='a', default=1)
+b = NonnegativeIntegerParameter(key='b', default=2)
+c = BaseParameter(key=('c',), default='x')
+
+
+#########
+# TESTS #
+#########
+
+
+def test_retrieve_all():
+    schema = ParameterSet(a, b, c=c)
+    snapshot = schema.retrieve_all(dict(a='3'))
+    assert (snapshot.a, snapshot.b, snapshot.c) == (3, 2, 'x')
+    assert snapshot.as_dict() == dict(a=3, b=2, c='x')
+    assert snapshot == schema.retrieve_all(dict(a=3))
+
+
+def test_retrieve_all_cached():
+    schema = ParameterSet(a, b)
+    kvs = KeyValueStore(b=4)
+    cache = kvs.enable_cache()
+    schema.retrieve_all(kvs)
+    assert schema.retrieve_all(kvs).b == 4
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_retrieve_all_invalid():
+    schema = ParameterSet(a, b)
+    with pytest.raises(ValidationFailure):
+        schema.retrieve_all(dict(b=-1))
+
+
+def test_snapshot_immutable():
+    snapshot = ParameterSet(a).retrieve_all(dict())
+    with pytest.raises(AttributeError):
+        snapshot.a = 2
+    with pytest.raises(AttributeError):
+        snapshot.z = 2
+
+
+def test_snapshot_copy_pickle_and_hash():
+    snapshot = ParameterSet(a, b).retrieve_all(dict(a=3))
+    assert copy.copy(snapshot) is snapshot
+    assert copy.deepcopy(snapshot) == snapshot
+    unpickled = pickle.loads(pickle.dumps(snapshot))
+    assert type(unpickled) is type(snapshot)
+    assert unpickled == snapshot
+    assert hash(unpickled) == hash(snapshot)
+    assert len({snapshot, unpickled}) == 1
+
+
+def test_duplicate_key():
+    with pytest.raises(ValueError):
+        ParameterSet(a, x=BaseParameter(key='a'))
+
+
+def test_add():
+    schema = ParameterSet(a)
+    schema.add(b, c=c)
+    assert schema['b'] is b
+    assert schema.retrieve_all(dict()).c == 'x'
+    with pytest.raises(ValueError):
+        schema.add(BaseParameter(key='b'))
+    assert schema['b'] is b
+
+
+def test_registry():
+    registry = Registry(a)
+    hyphenated = BaseParameter(key='output-volume', default=3)
+    registry.add(hyphenated, c)
+    assert registry['output-volume'] is hyphenated
+    assert registry[('c',)] is c
+    assert len(registry) == 3
+    assert registry.retrieve_all(dict(a=2)).as_dict() == dict(a=2)
+    assert registry.refine({'output-volume': 4}) == {'output-volume': 4}
+    with pytest.raises(ValueError):
+        registry.add(BaseParameter(key='output-volume'))
+    with pytest.raises(ValueError):
+        registry.add(BaseParameter(key='a'))
+    assert isinstance(REGISTRY, Registry)
+
+
+def test_snapshot_class_made_lazily():
+    registry = Registry()
+    for index in range(4000):
+        registry.add(BaseParameter(key='p{}'.format(index)))
+    assert registry._snapshot_class is None
+    assert len(registry.snapshot_class._fields) == 4000
+
+
+def test_refine():
+    schema = ParameterSet(a, b)
+    assert schema.refine(dict(a='3', z='y')) == dict(a=3)
+    with pytest.raises(InvalidContents) as info:
+        schema.refine(dict(a='x', b=-1))
+    assert set(info.value.errors) == {'a', 'b'}
+    assert isinstance(info.value.errors['a'], ParserError)
+    assert pickle.loads(pickle.dumps(info.value)).errors.keys() == {'a', 'b'}
+
+
+def test_unusable_name():
+    with pytest.raises(ValueError):
+        ParameterSet(c)
+    with pytest.raises(ValueError):
+        ParameterSet(as_dict=a)
+
+
+def test_pickle():
+    schema = ParameterSet(a, b, c=c)
+    clone = pickle.loads(pickle.dumps(schema))
+    assert clone.retrieve_all(dict(a=3)).as_dict() == dict(a=3, b=2, c='x')
+
+
+def test_validate():
+    failures = ParameterSet(a, b, c=c).validate(dict(a='x', b=-1))
+    assert set(failures) == {'a', 'b'}
+    assert isinstance(failures['a'], ParserError)
+    assert isinstance(failures['b'], ValidationFailure)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_validate_stores(workers):
+    schema = ParameterSet(a, b, c=c)
+    stores = [dict(b=i - 2) for i in range(5)]
+    results = list(validate_stores(schema, stores, workers=workers,
+                                   chunk_size=2))
+    assert [i for i, _ in results] == list(range(5))
+    assert [set(f) for _, f in results] == [{'b'}, {'b'}, set(), set(), set()]
+    assert type(results[0][1]['b']) is ValidationFailure
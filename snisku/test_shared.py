@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the shared module, using pytest."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard library:
+import multiprocessing
+
+# Third party:
+from pydispatch import dispatcher
+import pytest
+
+# Local:
+from .kvs import CHANGED
+from .param import BaseParameter
+from .shared import SharedStore
+
+
+#############
+# FIXTURES #
+#############
+
+
+@pytest.fixture
+def path(tmpdir):
+    return str(tmpdir.join('shared'))
+
+
+#########
+# TESTS #
+#########
+
+
+def test_roundtrip(path):
+    a = SharedStore(path)
+    a['a'] = 1
+    a.update(b=[2], c=None)
+    del a['c']
+    assert a == dict(a=1, b=[2])
+    a.close()
+    assert SharedStore(path) == dict(a=1, b=[2])
+
+
+def test_string_keys(path):
+    with pytest.raises(TypeError):
+        SharedStore(path)[1] = 1
+
+
+def test_bad_file(tmpdir):
+    f = tmpdir.join('other')
+    f.write('x' * 100)
+    with pytest.raises(ValueError):
+        SharedStore(str(f))
+
+
+def test_small_file(tmpdir):
+    f = tmpdir.join('other')
+    f.write('{"a": 1}')
+    with pytest.raises(ValueError):
+        SharedStore(str(f))
+    assert f.read() == '{"a": 1}'
+
+
+def test_empty_file(tmpdir):
+    f = tmpdir.join('empty')
+    f.write('')
+    SharedStore(str(f))['a'] = 1
+    assert SharedStore(str(f)) == dict(a=1)
+
+
+def test_visibility_and_signals(path):
+    a = SharedStore(path)
+    b = SharedStore(path)
+    cache = b.enable_cache()
+    p = BaseParameter(key='p', default=0)
+    assert p.retrieve(b) == 0
+
+    received = []
+
+    def receive(signal=None, sender=None, **kwargs):
+        received.append((signal, kwargs))
+
+    dispatcher.connect(receive, sender=b)
+    try:
+        p.store(a, 2)
+        assert b.refresh() == {'p'}
+        assert b.refresh() == set()
+    finally:
+        dispatcher.disconnect(receive, sender=b)
+    assert received == [('p', dict(merge=True, new_value=2)),
+                        (CHANGED, dict(keys=frozenset({'p'})))]
+    assert p.retrieve(b) == 2
+    assert cache.misses == 2
+
+    a.clear()
+    assert 'p' not in b
+
+
+def test_batch_merges_writes(path):
+    a = SharedStore(path)
+    b = SharedStore(path)
+    with a.batch():
+        a['x'] = 1
+        b['y'] = 2
+        assert 'x' not in b
+        a.clear()
+        a['z'] = 3
+        assert a == dict(z=3)
+    assert a == b == dict(z=3)
+
+
+def test_growth(path):
+    a = SharedStore(path, capacity=16)
+    b = SharedStore(path, capacity=16)
+    a.update({str(i): i for i in range(1000)})
+    assert len(b) == 1000
+
+
+def _write(path):
+    SharedStore(path)['child'] = True
+
+
+def test_other_process(path):
+    a = SharedStore(path)
+    process = multiprocessing.get_context('fork').Process(target=_write,
+                                                          args=(path,))
+    process.start()
+    process.join()
+    assert a == dict(child=True)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the sqlite module, using pytest."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Third party:
+from pydispatch import dispatcher
+import pytest
+
+# Local:
+from .kvs import CHANGED
+from .kvs import KeyValueStore
+from .sqlite import SQLiteStore
+from .types import AnyIntegerParameter
+
+
+#########
+# TESTS #
+#########
+
+
+def test_parameter_cycle(tmpdir):
+    f = tmpdir.join('settings.sqlite')
+    store = SQLiteStore(f, cache_size=2, batch_size=2)
+    parameter = AnyIntegerParameter(key='a', default=0)
+    assert parameter.retrieve(store) == 0
+    parameter.store(store, 1)
+    assert parameter.retrieve(store) == 1
+    for i in range(5):
+        store[str(i)] = [i]
+    assert parameter.retrieve(store) == 1
+    parameter.reset(store)
+    assert parameter.retrieve(store) == 0
+    store.close()
+
+    store = SQLiteStore(f)
+    assert dict(store) == {str(i): [i] for i in range(5)}
+    assert len(store) == 5
+    with pytest.raises(KeyError):
+        del store['a']
+    store.close()
+
+
+def test_signals():
+    store = SQLiteStore()
+    parameter = AnyIntegerParameter(key='a')
+    received = []
+
+    def on_a(new_value=None, reset=False):
+        received.append((new_value, reset))
+
+    def on_changed(keys=None):
+        received.append(keys)
+
+    dispatcher.connect(on_a, signal='a', sender=store)
+    dispatcher.connect(on_changed, signal=CHANGED, sender=store)
+    with store.batch():
+        parameter.store(store, 1)
+        parameter.store(store, 2)
+    store.clear()
+    assert received == [(2, False), {'a'}, (None, True), {'a'}]
+    assert not store
+
+
+def test_json_import_export(tmpdir):
+    f = tmpdir.join('settings.json')
+    KeyValueStore(a=1, b=[2]).dump(f)
+    store = SQLiteStore()
+    store['a'] = 1
+    assert store.load(f) == dict(b=[2])
+    store['c'] = None
+    store.dump(f)
+    assert KeyValueStore().load(f) == dict(a=1, b=[2], c=None)
+
+
+def test_non_string_key():
+    with pytest.raises(TypeError):
+        SQLiteStore()[1] = 1
+
+
+def test_unencodable_value():
+    store = SQLiteStore(batch_size=2)
+    with pytest.raises(TypeError):
+        store['a'] = object()
+    assert 'a' not in store
+    store['b'] = 1
+    store['c'] = 2
+    assert dict(store) == dict(b=1, c=2)
+
+
+def test_pending_value_mutated_in_place():
+    store = SQLiteStore()
+    value = [1]
+    store['a'] = value
+    value.append(2)
+    assert store['a'] == [1]
+    store.flush()
+    assert store['a'] == [1]
@@ -6,11 +6,25 @@
 ###########
 
 
+# Standard library:
+import pickle
+import subprocess
+import sys
+import weakref
+
 # Third party:
 import arrow
+import pytest
 
 # Local:
+from .exc import ParserError
+from .exc import ValidationFailure
 from .types import ArrowParameter
+from .types import BooleanParameter
+from .types import NonnegativeIntegerParameter
+from .types import NonnegativeRealParameter
+from .types import Range
+from .types import parse_arrow
 from .kvs import KeyValueStore
 
 
@@ -28,3 +42,97 @@ def test_store_retrieve_cycle():
     assert param.retrieve(kvs) == arrow.get('2020-02-02 00:00:00+00:00')
     param.reset(kvs)
     assert param.retrieve(kvs) == default
+
+
+def test_range():
+    validator = Range(0, 10)
+    assert validator(0) and validator(10)
+    assert not validator(-1)
+    assert not validator(float('nan'))
+    assert Range()(float('nan'))
+
+
+def test_range_many():
+    numpy = pytest.importorskip('numpy')
+    values = numpy.array([-1.0, 0.0, 10.0, 11.0, float('nan')])
+    assert Range(0, 10).many(values).tolist() == [False, True, True, False,
+                                                  False]
+    assert Range().many(values).all()
+
+
+def test_nonnegative_many():
+    pytest.importorskip('numpy')
+    p = NonnegativeIntegerParameter(key='n')
+    values, failures = p.parse_and_validate_many([3, -1, 0])
+    assert values.tolist() == [3, -1, 0]
+    assert failures == {1: ValidationFailure}
+
+    p = NonnegativeRealParameter(key='r')
+    values, failures = p.parse_and_validate_many(['1.5', 'x', '-2'])
+    assert values == [1.5, None, None]
+    assert failures == {1: ParserError, 2: ValidationFailure}
+
+
+def test_pickle():
+    param = pickle.loads(pickle.dumps(ArrowParameter(key='t')))
+    assert param.dumper(arrow.get('2020-02-02')) == '2020-02-02T00:00:00+00:00'
+    param = pickle.loads(pickle.dumps(NonnegativeRealParameter(key='r')))
+    assert param.validator == Range(0)
+
+
+def test_lazy_imports():
+    code = '\n'.join([
+        'import sys',
+        'import snisku',
+        'from snisku.kvs import KeyValueStore',
+        'from snisku.types import BooleanParameter',
+        'BooleanParameter(key="b").store(KeyValueStore(), True)',
+        'print(" ".join(m for m in ("arrow", "asyncio", "pydispatch")',
+        '               if m in sys.modules))',
+    ])
+    output = subprocess.run([sys.executable, '-c', code], check=True,
+                            stdout=subprocess.PIPE).stdout
+    assert output.strip() == b''
+
+
+def test_star_import():
+    code = '\n'.join([
+        'import sys',
+        'from snisku import *',
+        'import snisku',
+        'print(" ".join(m for m in ("asyncio", "fcntl", "snisku.sqlite")',
+        '               if m in sys.modules))',
+        'assert snisku.shared and "shared" in dir(snisku)',
+    ])
+    output = subprocess.run([sys.executable, '-c', code], check=True,
+                            stdout=subprocess.PIPE).stdout
+    assert output.strip() == b''
+
+
+@pytest.mark.parametrize('string', ['2020-02-02T10:20:30+00:00',
+                                    '2020-02-02T10:20:30.000004-08:00',
+                                    '2020-02-02T10:20:30+05:45',
+                                    '2020-02-02',
+                                    '2020-02-02T10:20:30Z',
+                                    '2020-01-01T24:00:00+00:00'])
+def test_parse_arrow(string):
+    value = parse_arrow(string)
+    expected = arrow.get(string)
+    assert value == expected
+    assert value.utcoffset() == expected.utcoffset()
+    assert value.for_json() == expected.for_json()
+    assert parse_arrow(string) is value  # Cached.
+
+
+def test_parse_arrow_invalid():
+    with pytest.raises(ValueError):
+        parse_arrow('2020-02-30T00:00:00+00:00')
+
+
+@pytest.mark.parametrize('cls', [BooleanParameter, ArrowParameter,
+                                 NonnegativeIntegerParameter,
+                                 NonnegativeRealParameter])
+def test_slots(cls):
+    parameter = cls(key='k')
+    assert not hasattr(parameter, '__dict__')
+    assert weakref.ref(parameter)() is parameter
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the watch module, using pytest."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard library:
+import json
+import os
+import time
+
+# Third party:
+from pydispatch import dispatcher
+
+# Local:
+from .kvs import CHANGED
+from .kvs import KeyValueStore
+
+
+#########
+# TESTS #
+#########
+
+
+def test_missing_file(tmpdir):
+    f = tmpdir.join('settings.json')
+    kvs = KeyValueStore(a=1)
+    watcher = kvs.watch(f, interval=None)
+    assert watcher.poll() is None
+    assert kvs == dict(a=1)
+
+
+def test_changed_keys_only(tmpdir):
+    f = tmpdir.join('settings.json')
+    f.write(json.dumps(dict(a=1, b=2)))
+    kvs = KeyValueStore()
+    watcher = kvs.watch(f, interval=None)
+    assert kvs == dict(a=1, b=2)
+    assert watcher.poll() is None
+
+    received = []
+
+    def receive(signal=None, **kwargs):
+        received.append(signal)
+
+    dispatcher.connect(receive, sender=kvs)
+    try:
+        # Rewrite in place, with an unchanged size.
+        f.write(json.dumps(dict(a=1, b=3)))
+        os.utime(f, ns=(0, 0))
+        assert watcher.poll() == dict(b=3)
+    finally:
+        dispatcher.disconnect(receive, sender=kvs)
+    assert received == ['b', CHANGED]
+    assert kvs == dict(a=1, b=3)
+
+
+def test_atomic_replacement(tmpdir):
+    f = tmpdir.join('settings.json')
+    writer = KeyValueStore(a=1)
+    writer.dump(f, atomic=True)
+    reader = KeyValueStore()
+    watcher = reader.watch(f, interval=None)
+    mtime = os.stat(f).st_mtime_ns
+
+    # Rename a new file of the same size and modification time into place.
+    writer['a'] = 2
+    writer.dump(f, atomic=True)
+    os.utime(f, ns=(mtime, mtime))
+    assert watcher.poll() == dict(a=2)
+    assert reader == dict(a=2)
+
+
+def test_background_polling(tmpdir):
+    f = tmpdir.join('settings.json')
+    kvs = KeyValueStore()
+    watcher = kvs.watch(f, interval=0.01)
+    try:
+        KeyValueStore(a=1).dump(f, atomic=True)
+        deadline = time.monotonic() + 5
+        while 'a' not in kvs and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        watcher.close()
+    assert kvs == dict(a=1)
+    assert watcher.error is None
@@ -11,6 +11,7 @@ import pytest
 
 # Local:
 from .exc import ValidationFailure
+from .whitelist import OptionWhitelist
 from .whitelist import WhitelistOption
 from .whitelist import WhitelistParameter
 from .kvs import KeyValueStore
@@ -41,3 +42,35 @@ def test_two_strings():
     param.store(kvs, 'c')
     with pytest.raises(ValidationFailure):
         param.retrieve(kvs)
+
+
+def test_by_value():
+    with pytest.warns(DeprecationWarning):
+        o0 = WhitelistOption('a')
+    with pytest.warns(DeprecationWarning):
+        whitelist = OptionWhitelist([o0])
+    assert whitelist.by_value('a') is o0
+
+    with pytest.warns(DeprecationWarning):
+        o1 = WhitelistOption('b')
+    with pytest.raises(KeyError):
+        whitelist.by_value('b')
+    whitelist.append(o1)
+    assert whitelist.by_value('b') is o1
+
+
+def test_whitelist_mutated_after_parameter():
+    with pytest.warns(DeprecationWarning):
+        o0 = WhitelistOption('a')
+    with pytest.warns(DeprecationWarning):
+        o1 = WhitelistOption('b')
+    with pytest.warns(DeprecationWarning):
+        whitelist = OptionWhitelist([o0])
+    with pytest.warns(DeprecationWarning):
+        param = WhitelistParameter(key='p', options=whitelist)
+
+    kvs = KeyValueStore(p='b')
+    with pytest.raises(ValidationFailure):
+        param.retrieve(kvs)
+    whitelist.append(o1)
+    assert param.retrieve(kvs) == 'b'
@@ -6,8 +6,12 @@
 #############
 
 
-# Third party:
-import arrow
+# Standard:
+from datetime import datetime
+from functools import lru_cache
+import re
+from typing import Any
+from typing import Dict
 
 # Local:
 from .param import BaseParameter
@@ -18,9 +22,59 @@ from .param import BaseParameter
 #############
 
 
+class Range(object):
+    """A validator of numbers within inclusive bounds.
+
+    A bound of None means no bound. Arrays of values can be validated at
+    once, with the ‘many’ method, as in BaseParameter.parse_and_validate_many.
+
+    """
+
+    __slots__ = ('minimum', 'maximum')
+
+    def __init__(self, minimum: Any = None, maximum: Any = None) -> None:
+        """Initialize."""
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def __call__(self, value: Any) -> bool:
+        """Return True if passed value is within bounds."""
+        return ((self.minimum is None or value >= self.minimum) and
+                (self.maximum is None or value <= self.maximum))
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Range):
+            return NotImplemented
+        return (self.minimum, self.maximum) == (other.minimum, other.maximum)
+
+    def __hash__(self) -> int:
+        return hash((self.minimum, self.maximum))
+
+    def __repr__(self) -> str:
+        return '{}({!r}, {!r})'.format(type(self).__name__, self.minimum,
+                                       self.maximum)
+
+    def many(self, values: Any) -> Any:
+        """Return a Boolean mask of valid values in passed NumPy array.
+
+        NaN is not within any bounds, as it is not for ‘__call__’, unless
+        there are no bounds.
+
+        """
+        valid = values.astype(bool)
+        valid[:] = True
+        if self.minimum is not None:
+            valid &= values >= self.minimum
+        if self.maximum is not None:
+            valid &= values <= self.maximum
+        return valid
+
+
 class BooleanParameter(BaseParameter):
     """A Boolean parameter."""
 
+    __slots__ = ()
+
     def __init__(self, parser=bool, **kwargs):
         super().__init__(parser=parser, **kwargs)
 
@@ -32,6 +86,8 @@ class BooleanParameter(BaseParameter):
 class AnyIntegerParameter(BaseParameter):
     """An integer parameter."""
 
+    __slots__ = ()
+
     def __init__(self, parser=int, **kwargs):
         super().__init__(parser=parser, **kwargs)
 
@@ -39,6 +95,8 @@ class AnyIntegerParameter(BaseParameter):
 class AnyRealParameter(BaseParameter):
     """A parameter for real numbers, represented via floating point."""
 
+    __slots__ = ()
+
     def __init__(self, parser=float, **kwargs):
         super().__init__(parser=parser, **kwargs)
 
@@ -46,7 +104,9 @@ class AnyRealParameter(BaseParameter):
 class NonnegativeParameter(BaseParameter):
     """A numeric parameter that can’t be negative."""
 
-    def __init__(self, validator=lambda v: v >= 0, **kwargs):
+    __slots__ = ()
+
+    def __init__(self, validator=Range(minimum=0), **kwargs):
         """Inject a default validator but no purpose."""
         super().__init__(validator=validator, **kwargs)
 
@@ -54,14 +114,81 @@ class NonnegativeParameter(BaseParameter):
 class NonnegativeIntegerParameter(AnyIntegerParameter, NonnegativeParameter):
     """An integer parameter that has to be non-negative."""
 
+    __slots__ = ()
+
 
 class NonnegativeRealParameter(AnyRealParameter, NonnegativeParameter):
     """A real-number parameter that has to be non-negative."""
 
+    __slots__ = ()
+
+
+def parse_arrow(value: Any) -> Any:
+    """Return an Arrow object, as from ‘arrow.get’.
+
+    This is the default parser for ArrowParameter. Arrow is imported on first
+    use, as it is slow to import.
+
+    Strings in the format of ‘for_json’, as written by ArrowParameter, take
+    a fast path, with the same result as ‘arrow.get’. Recently parsed strings
+    are cached.
+
+    """
+    if type(value) is str:
+        return _parse_arrow_string(value)
+    import arrow
+    return arrow.get(value)
+
+
+def dump_arrow(value: Any) -> str:
+    """Return passed Arrow object as a string. Default for ArrowParameter."""
+    return value.for_json()
+
 
 class ArrowParameter(BaseParameter):
     """A parameter representing a date and time using Arrow."""
 
-    def __init__(self, parser=arrow.get, dumper=lambda a: a.for_json(),
+    __slots__ = ()
+
+    def __init__(self, parser=parse_arrow, dumper=dump_arrow,
                  **kwargs):
         super().__init__(parser=parser, dumper=dumper, **kwargs)
+
+
+############
+# INTERNAL #
+############
+
+
+# The canonical ISO 8601 format of Arrow.for_json: Seconds, optional
+# microseconds and a UTC offset in hours and minutes.
+_ISO_8601 = re.compile(r'\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d{6})?'
+                       r'([+-]\d\d:\d\d)')
+
+# Time zones by UTC offset, as parsed by Arrow.
+_TIME_ZONES: Dict[str, Any] = dict()
+
+
+@lru_cache(maxsize=2 ** 10)
+def _parse_arrow_string(value: str) -> Any:
+    """Parse a string as arrow.get would, with caching.
+
+    Arrow objects are immutable, so the cache can share them.
+
+    """
+    import arrow
+    match = _ISO_8601.fullmatch(value)
+    if match is None:
+        return arrow.get(value)
+
+    offset = match.group(1)
+    tzinfo = _TIME_ZONES.get(offset)
+    if tzinfo is None:
+        tzinfo = _TIME_ZONES[offset] = arrow.parser.TzinfoParser.parse(offset)
+    try:
+        d = datetime.fromisoformat(value)
+    except ValueError:
+        # Valid ISO 8601 that datetime rejects, such as 24:00:00.
+        return arrow.get(value)
+    return arrow.Arrow(d.year, d.month, d.day, d.hour, d.minute, d.second,
+                       d.microsecond, tzinfo=tzinfo)
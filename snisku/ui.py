@@ -13,6 +13,8 @@ class UserInterfacePresenter(object):
 
     """
 
+    __slots__ = ('name', 'summary', 'explanation', '__weakref__')
+
     def __init__(self, name: str = None, summary: str = None,
                  explanation: str = None) -> None:
         """Initialize. Store passed optional strings.
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""Reloading of key-value stores from files as the files change."""
+
+###########
+# IMPORTS #
+###########
+
+
+# Standard:
+import json
+import os
+import threading
+from typing import Any
+from typing import Dict
+from typing import Hashable
+from typing import Optional
+from typing import Tuple
+
+
+#############
+# INTERFACE #
+#############
+
+
+class Watcher(object):
+    """A poller of a file, loading it into a key-value store when changed.
+
+    A change is detected by the modification time, size and inode number of
+    the file, which costs one call to ‘stat’ per poll. A writer that replaces
+    the file by renaming a new file over it, as with ‘atomic’ dumps, changes
+    the inode number. While the file is missing, as between the removal and
+    replacement of the file by some other writers, it is not loaded.
+
+    A changed file is loaded as by KeyValueStore.load with ‘new_only’, so only
+    keys with new values are signalled. Keys removed from the file are not
+    removed from the store.
+
+    With an ‘interval’ in seconds, polling takes place in a background thread,
+    and the store is updated, and signals are sent, from that thread. An error
+    in loading is then stored as ‘error’ and loading is retried after another
+    interval. With an ‘interval’ of None, call ‘poll’ instead.
+
+    """
+
+    def __init__(self, kvs, filepath, interval: Optional[float] = 1.0,
+                 handler=json.load, mode: str = 'r',
+                 signal: bool = True) -> None:
+        """Initialize. Load named file if it exists. Start polling.
+
+        ‘handler’ and ‘mode’ are as for KeyValueStore.load.
+
+        """
+        self.kvs = kvs
+        self.filepath = os.fspath(filepath)
+        self.interval = interval
+        self.handler = handler
+        self.mode = mode
+        self.signal = signal
+        self.error: Optional[Exception] = None
+
+        self._stamp: Optional[_Stamp] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.poll()
+        if interval is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True,
+                                            name='snisku-watch')
+            self._thread.start()
+
+    def poll(self) -> Optional[Dict[Hashable, Any]]:
+        """Load the file if it has changed. Return new contents, if loaded.
+
+        Return None if the file has not changed or is missing.
+
+        """
+        try:
+            if _stamp(os.stat(self.filepath)) == self._stamp:
+                return None
+            f = open(self.filepath, mode=self.mode)
+        except FileNotFoundError:
+            return None
+        with f:
+            # Stamp the file that is actually read, in case it has just been
+            # replaced. The stamp is kept only if the file can be loaded.
+            stamp = _stamp(os.fstat(f.fileno()))
+            new = self.kvs.absorb(self.handler(f), new_only=True,
+                                  signal=self.signal)
+        self._stamp = stamp
+        return new
+
+    def close(self) -> None:
+        """Stop polling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        """Poll in the background until closed."""
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                self.error = e
+            else:
+                self.error = None
+
+
+############
+# INTERNAL #
+############
+
+
+# Modification time in nanoseconds, size and inode number.
+_Stamp = Tuple[int, int, int]
+
+
+def _stamp(result: os.stat_result) -> _Stamp:
+    return result.st_mtime_ns, result.st_size, result.st_ino
@@ -13,10 +13,12 @@ This module will be removed in Snisku 1.0.0.
 # Standard library:
 from typing import Any
 from typing import Hashable
+from typing import Optional
 from warnings import warn
 
 # Local:
 from .option import Option
+from .option import OptionIndex
 from .option import ExhaustiveParameter
 from .option import none  # noqa (0.2.0 backwards compatibily)
 
@@ -39,17 +41,22 @@ class WhitelistOption(Option):
 class OptionWhitelist(list):
     """An exhaustive list of options for a WhitelistParameter."""
 
+    # A cached OptionIndex, discarded on mutation.
+    _index = None
+
     def __init__(self, *args, **kwargs):
         warn('snisku.whitelist.OptionWhiteList is deprecated in favour '
              'of any tuple of snisku.option.Option', DeprecationWarning)
         super().__init__(*args, **kwargs)
 
     def by_value(self, value):
-        """Look up an option by its value. O(n)."""
-        for option in self:
-            if option.value == value:
-                return option
-        raise KeyError('Value ‘{}’ is not whitelisted.')
+        """Look up an option by its value. O(1) for hashable values."""
+        if self._index is None:
+            self._index = OptionIndex(self)
+        option = self._index.get(value)
+        if option is None:
+            raise KeyError('Value ‘{}’ is not whitelisted.'.format(value))
+        return option
 
 
 class WhitelistParameter(ExhaustiveParameter):
@@ -60,3 +67,36 @@ class WhitelistParameter(ExhaustiveParameter):
              'of any tuple of snisku.option.ExhaustiveParameter',
              DeprecationWarning)
         super().__init__(*args, **kwargs)
+
+    def _find(self, value: Any) -> Optional[Option]:
+        """Extend parent method to use the index of an OptionWhitelist."""
+        if isinstance(self.options, OptionWhitelist):
+            try:
+                return self.options.by_value(value)
+            except KeyError:
+                return None
+        return super()._find(value)
+
+
+############
+# INTERNAL #
+############
+
+
+def _invalidating(name):
+    """Wrap a mutating list method to discard a cached index."""
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        self._index = None
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+for _name in ('__setitem__', '__delitem__', '__iadd__', '__imul__', 'append',
+              'clear', 'extend', 'insert', 'pop', 'remove', 'reverse',
+              'sort'):
+    setattr(OptionWhitelist, _name, _invalidating(_name))